@@ -0,0 +1,21 @@
+from django.contrib import admin
+from .models import DailyGrowthStats, DailyOrderStats
+
+
+@admin.register(DailyOrderStats)
+class DailyOrderStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'order_status', 'payment_status', 'order_count', 'amount')
+    list_filter = ('order_status', 'payment_status')
+    date_hierarchy = 'date'
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyGrowthStats)
+class DailyGrowthStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'new_users', 'new_sellers', 'new_products')
+    date_hierarchy = 'date'
+
+    def has_change_permission(self, request, obj=None):
+        return False
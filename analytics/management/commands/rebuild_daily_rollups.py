@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from analytics.rollups import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily order and growth rollups from the orders, users and products tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Only rebuild the last N days (default: all history)')
+
+    def handle(self, *args, **options):
+        days = None
+        if options['days']:
+            today = timezone.localdate()
+            days = [today - timedelta(days=n) for n in range(options['days'])]
+        order_rows, growth_rows = rebuild_daily_rollups(days)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt {order_rows} daily order stats and {growth_rows} daily growth rows'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analytics.sellers import rebuild_seller_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-seller daily sales facts from order lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seller', type=int, action='append', dest='sellers', help='Seller id (repeatable)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_seller_stats(options['sellers'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {rows} seller stats rows'))
@@ -0,0 +1,87 @@
+# Generated by Django 6.0 on 2026-10-18 18:51
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    User = apps.get_model('accounts', 'User')
+    Product = apps.get_model('products', 'Product')
+    DailyOrderStats = apps.get_model('analytics', 'DailyOrderStats')
+    DailyGrowthStats = apps.get_model('analytics', 'DailyGrowthStats')
+
+    rows = (
+        Order.objects.order_by()
+        .annotate(date=TruncDate('created_at'))
+        .values('date', 'order_status', 'payment_status')
+        .annotate(order_count=Count('id'), amount=Sum('final_amount'))
+    )
+    DailyOrderStats.objects.bulk_create([DailyOrderStats(**row) for row in rows], batch_size=1000)
+
+    growth = defaultdict(dict)
+    users = (
+        User.objects.order_by().annotate(date=TruncDate('created_at')).values('date')
+        .annotate(new_users=Count('id'), new_sellers=Count('id', filter=Q(is_seller=True)))
+    )
+    for row in users:
+        growth[row.pop('date')].update(row)
+    products = (
+        Product.objects.order_by().annotate(date=TruncDate('created_at')).values('date')
+        .annotate(new_products=Count('id'))
+    )
+    for row in products:
+        growth[row.pop('date')].update(row)
+    DailyGrowthStats.objects.bulk_create(
+        [DailyGrowthStats(date=day, **counts) for day, counts in growth.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('orders', '0004_admin_order_list_indexes'),
+        ('products', '0009_product_reserved_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyGrowthStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('new_users', models.IntegerField(default=0)),
+                ('new_sellers', models.IntegerField(default=0)),
+                ('new_products', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Growth Stats',
+                'verbose_name_plural': 'Daily Growth Stats',
+                'db_table': 'daily_growth_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyOrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('order_status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('refunded', 'Refunded')], max_length=20)),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('refunded', 'Refunded')], max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Order Stats',
+                'verbose_name_plural': 'Daily Order Stats',
+                'db_table': 'daily_order_stats',
+                'constraints': [models.UniqueConstraint(fields=('date', 'order_status', 'payment_status'), name='daily_order_stats_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 6.0 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Q, Sum
+from django.db.models.functions import TruncDate
+
+SALE_STATUSES = ('confirmed', 'processing', 'shipped', 'delivered', 'refunded')
+
+
+def backfill_seller_stats(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    StockReservation = apps.get_model('inventory', 'StockReservation')
+    SellerDailyStats = apps.get_model('analytics', 'SellerDailyStats')
+    SellerProductDailyStats = apps.get_model('analytics', 'SellerProductDailyStats')
+
+    line_total = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    returned = Q(order__order_status='refunded')
+    # Refunds of cancelled orders were never sales
+    cancelled_first = (
+        Exists(StockMovement.objects.filter(order_id=OuterRef('order_id'), reason='cancellation'))
+        | Exists(StockReservation.objects.filter(order_id=OuterRef('order_id'), status='released'))
+    )
+    items = (
+        OrderItem.objects.filter(product__isnull=False, order__order_status__in=SALE_STATUSES)
+        .exclude(returned & cancelled_first)
+        .order_by()
+        .annotate(seller_id=F('product__seller_id'), date=TruncDate('order__created_at'))
+    )
+    line_facts = {
+        'units': Sum('quantity'),
+        'revenue': Sum(line_total),
+        'returned_units': Sum('quantity', filter=returned, default=0),
+        'returned_revenue': Sum(line_total, filter=returned, default=0),
+    }
+    seller_rows = items.values('seller_id', 'date').annotate(
+        orders=Count('order_id', distinct=True),
+        returned_orders=Count('order_id', distinct=True, filter=returned),
+        **line_facts,
+    )
+    SellerDailyStats.objects.bulk_create([SellerDailyStats(**row) for row in seller_rows], batch_size=1000)
+    product_rows = items.values('seller_id', 'product_id', 'date').annotate(**line_facts)
+    SellerProductDailyStats.objects.bulk_create(
+        [SellerProductDailyStats(**row) for row in product_rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('inventory', '0002_stock_reservations'),
+        ('orders', '0004_admin_order_list_indexes'),
+        ('products', '0009_product_reserved_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('returned_orders', models.IntegerField(default=0)),
+                ('returned_units', models.IntegerField(default=0)),
+                ('returned_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Seller Daily Stats',
+                'verbose_name_plural': 'Seller Daily Stats',
+                'db_table': 'seller_daily_stats',
+                'constraints': [models.UniqueConstraint(fields=('seller', 'date'), name='seller_daily_stats_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SellerProductDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('returned_units', models.IntegerField(default=0)),
+                ('returned_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.product')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_product_sales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Seller Product Daily Stats',
+                'verbose_name_plural': 'Seller Product Daily Stats',
+                'db_table': 'seller_product_daily_stats',
+                'indexes': [models.Index(fields=['seller', 'date'], name='seller_product_daily_idx')],
+                'constraints': [models.UniqueConstraint(fields=('seller', 'product', 'date'), name='seller_product_daily_stats_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_seller_stats, migrations.RunPython.noop),
+    ]
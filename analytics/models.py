@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db import models
+from orders.models import Order
+from products.models import Product
+
+
+class DailyOrderStats(models.Model):
+    """Orders created on a day, by their current order and payment status"""
+    date = models.DateField()
+    order_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    payment_status = models.CharField(max_length=20, choices=Order.PAYMENT_STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'daily_order_stats'
+        verbose_name = 'Daily Order Stats'
+        verbose_name_plural = 'Daily Order Stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'order_status', 'payment_status'], name='daily_order_stats_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.date} {self.order_status}/{self.payment_status}: {self.order_count}'
+
+
+class DailyGrowthStats(models.Model):
+    """Users, sellers and products that joined on a day and still exist"""
+    date = models.DateField(unique=True)
+    new_users = models.IntegerField(default=0)
+    new_sellers = models.IntegerField(default=0)
+    new_products = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'daily_growth_stats'
+        verbose_name = 'Daily Growth Stats'
+        verbose_name_plural = 'Daily Growth Stats'
+
+    def __str__(self):
+        return f'{self.date}: +{self.new_users} users, +{self.new_products} products'
+
+
+class SellerDailyStats(models.Model):
+    """A seller's sales on the day the orders were placed"""
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_sales')
+    date = models.DateField()
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    returned_orders = models.IntegerField(default=0)
+    returned_units = models.IntegerField(default=0)
+    returned_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'seller_daily_stats'
+        verbose_name = 'Seller Daily Stats'
+        verbose_name_plural = 'Seller Daily Stats'
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'date'], name='seller_daily_stats_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.seller} {self.date}: ₹{self.revenue}'
+
+
+class SellerProductDailyStats(models.Model):
+    """One product's sales on a day, for the seller's top product rankings"""
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_product_sales')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    date = models.DateField()
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    returned_units = models.IntegerField(default=0)
+    returned_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'seller_product_daily_stats'
+        verbose_name = 'Seller Product Daily Stats'
+        verbose_name_plural = 'Seller Product Daily Stats'
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'product', 'date'], name='seller_product_daily_stats_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['seller', 'date'], name='seller_product_daily_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.product} {self.date}: {self.units} units'
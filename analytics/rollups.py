@@ -0,0 +1,178 @@
+"""
+Daily rollups - IndiVibe E-Commerce
+
+DailyOrderStats keeps, for each day orders were created on, how many of
+them are in each (order status, payment status) and their final amount;
+DailyGrowthStats counts users, sellers and products by the day they
+joined. Signals apply deltas as rows are created, change or are deleted,
+always against the row's creation day, so rebuilding from history gives
+the same numbers. The admin dashboard reads its totals from these few
+rows per day instead of counting the users, products and orders tables.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from accounts.models import User
+from orders.models import Order
+from products.models import Product
+from .models import DailyGrowthStats, DailyOrderStats
+
+REVENUE_PAYMENT_STATUS = 'paid'
+GROWTH_FIELDS = ('new_users', 'new_sellers', 'new_products')
+
+
+def day_of(value):
+    """The local calendar day a timestamp falls on (today for unsaved rows)"""
+    return timezone.localdate(value) if value else timezone.localdate()
+
+
+def add_to_row(rows, changes, create):
+    """UPDATE rows with F() deltas, creating the row first if it's missing"""
+    if not rows.update(**changes) and create:
+        rows.model.objects.get_or_create(**create)
+        rows.update(**changes)
+
+
+def add_order_stats(day, order_status, payment_status, count_delta, amount_delta):
+    """Add count_delta orders worth amount_delta to one day/status bucket"""
+    if not count_delta and not amount_delta:
+        return
+    key = {'date': day, 'order_status': order_status, 'payment_status': payment_status}
+    add_to_row(
+        DailyOrderStats.objects.filter(**key),
+        {'order_count': F('order_count') + count_delta, 'amount': F('amount') + amount_delta},
+        # Removals never create rows: there's nothing to take away from
+        key if count_delta > 0 else None,
+    )
+
+
+def add_order_stats_deltas(deltas):
+    """Apply {(day, order_status, payment_status): [count, amount]} in one pass"""
+    for (day, order_status, payment_status), (count, amount) in deltas.items():
+        add_order_stats(day, order_status, payment_status, count, amount)
+
+
+def add_growth(day, **deltas):
+    """add_growth(day, new_users=1, ...) adjusts that day's growth counters"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    add_to_row(
+        DailyGrowthStats.objects.filter(date=day),
+        {field: F(field) + delta for field, delta in deltas.items()},
+        {'date': day} if any(delta > 0 for delta in deltas.values()) else None,
+    )
+
+
+def _created_on(days):
+    """created_at falls on one of the given local days (index range per day)"""
+    condition = Q()
+    for day in days:
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        condition |= Q(created_at__gte=start, created_at__lt=start + timedelta(days=1))
+    return condition
+
+
+def _per_day(queryset, **aggregates):
+    return (
+        queryset.order_by()
+        .annotate(date=TruncDate('created_at'))
+        .values('date')
+        .annotate(**aggregates)
+    )
+
+
+def rebuild_order_stats(days=None):
+    """Recompute DailyOrderStats from the orders table; returns rows written"""
+    orders = Order.objects.all()
+    stats = DailyOrderStats.objects.all()
+    if days is not None:
+        days = set(days)
+        if not days:
+            return 0
+        orders = orders.filter(_created_on(days))
+        stats = stats.filter(date__in=days)
+    rows = (
+        orders.order_by()
+        .annotate(date=TruncDate('created_at'))
+        .values('date', 'order_status', 'payment_status')
+        .annotate(order_count=Count('id'), amount=Sum('final_amount'))
+    )
+    with transaction.atomic():
+        stats.delete()
+        created = DailyOrderStats.objects.bulk_create(
+            [DailyOrderStats(**row) for row in rows], batch_size=1000
+        )
+    return len(created)
+
+
+def rebuild_growth_stats(days=None):
+    """Recompute DailyGrowthStats from users and products; returns rows written"""
+    users = User.objects.all()
+    products = Product.objects.all()
+    stats = DailyGrowthStats.objects.all()
+    if days is not None:
+        days = set(days)
+        if not days:
+            return 0
+        users = users.filter(_created_on(days))
+        products = products.filter(_created_on(days))
+        stats = stats.filter(date__in=days)
+
+    growth = defaultdict(lambda: dict.fromkeys(GROWTH_FIELDS, 0))
+    for row in _per_day(users, new_users=Count('id'), new_sellers=Count('id', filter=Q(is_seller=True))):
+        growth[row['date']].update(new_users=row['new_users'], new_sellers=row['new_sellers'])
+    for row in _per_day(products, new_products=Count('id')):
+        growth[row['date']]['new_products'] = row['new_products']
+
+    with transaction.atomic():
+        stats.delete()
+        created = DailyGrowthStats.objects.bulk_create(
+            [DailyGrowthStats(date=day, **counts) for day, counts in growth.items()], batch_size=1000
+        )
+    return len(created)
+
+
+def rebuild_daily_rollups(days=None):
+    """Rebuild every daily rollup, for the given days or all of history"""
+    return rebuild_order_stats(days), rebuild_growth_stats(days)
+
+
+def dashboard_totals(recent_days=30):
+    """Headline numbers for the admin dashboard, read from the rollups"""
+    since = timezone.localdate() - timedelta(days=recent_days)
+    growth = DailyGrowthStats.objects.aggregate(
+        users=Coalesce(Sum('new_users'), 0),
+        sellers=Coalesce(Sum('new_sellers'), 0),
+        products=Coalesce(Sum('new_products'), 0),
+    )
+
+    orders_by_status = dict.fromkeys(dict(Order.STATUS_CHOICES), 0)
+    total_revenue = recent_revenue = Decimal('0')
+    rows = DailyOrderStats.objects.values('order_status', 'payment_status').annotate(
+        orders=Sum('order_count'),
+        total=Sum('amount'),
+        recent_total=Sum('amount', filter=Q(date__gte=since)),
+    )
+    for row in rows:
+        orders_by_status[row['order_status']] = orders_by_status.get(row['order_status'], 0) + row['orders']
+        if row['payment_status'] == REVENUE_PAYMENT_STATUS:
+            total_revenue += row['total'] or 0
+            recent_revenue += row['recent_total'] or 0
+
+    return {
+        'total_users': growth['users'],
+        'total_sellers': growth['sellers'],
+        'total_products': growth['products'],
+        'total_orders': sum(orders_by_status.values()),
+        'orders_by_status': orders_by_status,
+        'total_revenue': total_revenue,
+        'recent_revenue': recent_revenue,
+    }
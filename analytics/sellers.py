@@ -0,0 +1,234 @@
+"""
+Seller analytics - IndiVibe E-Commerce
+
+SellerDailyStats and SellerProductDailyStats hold each seller's sales per
+day the orders were placed: distinct orders, units and gross revenue
+(price * quantity of the seller's lines), and the part of it that was
+later refunded. An order counts as a sale once it reaches a fulfilment
+status, and a refund of a fulfilled order as a sale plus a return. A
+refund of a cancelled order was never a sale and counts for nothing; the
+ledger tells those apart when rebuilding (a 'cancellation' movement or a
+released reservation), and the previous status does when applying a
+status change, so deltas and a rebuild agree. The seller dashboard
+reads a bounded number of these rows (one per day, or per product and
+day, in the window), so its cost doesn't depend on how many orders the
+seller has.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from inventory.models import StockMovement, StockReservation
+from orders.models import Order, OrderItem
+from orders.workflow import FULFILMENT_STATUSES
+from .models import SellerDailyStats, SellerProductDailyStats
+from .rollups import add_to_row
+
+RETURN_STATUSES = ('refunded',)
+SALE_STATUSES = FULFILMENT_STATUSES + RETURN_STATUSES
+SERIES_PERIODS = (7, 30, 90)
+TOP_PRODUCTS = 5
+
+LINE_TOTAL = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def contribution(order_status, sold=True):
+    """
+    (sale, returned) flags an order in this status adds to the facts; sold
+    says whether a refunded order had been fulfilled before its refund.
+    """
+    if order_status in RETURN_STATUSES:
+        return int(sold), int(sold)
+    return int(order_status in FULFILMENT_STATUSES), 0
+
+
+def _cancelled_first(order_id):
+    """Condition on order_id: the order was cancelled at some point"""
+    return (
+        Exists(StockMovement.objects.filter(order_id=order_id, reason='cancellation'))
+        | Exists(StockReservation.objects.filter(order_id=order_id, status='released'))
+    )
+
+
+def refunds_of_cancelled(order_ids):
+    """The orders among order_ids that were cancelled before being refunded"""
+    return set(
+        Order.objects.filter(pk__in=order_ids)
+        .filter(_cancelled_first(OuterRef('pk')))
+        .values_list('pk', flat=True)
+    )
+
+
+def _seller_lines(order_ids):
+    return (
+        OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False, seller__isnull=False)
+        .values_list('order_id', 'product_id', 'seller_id', 'quantity', 'price')
+    )
+
+
+def apply_order_changes(changes):
+    """
+    Apply status changes to the seller facts.
+
+    changes is {order_id: (day, old_status, new_status)}; old_status is
+    None for an order that didn't exist before and new_status None for
+    one being deleted.
+    """
+    # Whether a refunded order was sold: from the status it is refunded
+    # from, or from the ledger when that status isn't known here
+    unknown = [
+        order_id for order_id, (day, old_status, new_status) in changes.items()
+        if old_status != new_status and (
+            old_status in RETURN_STATUSES or (old_status is None and new_status in RETURN_STATUSES)
+        )
+    ]
+    cancelled = refunds_of_cancelled(unknown) if unknown else set()
+
+    factors = {}
+    for order_id, (day, old_status, new_status) in changes.items():
+        was_sold = order_id not in cancelled
+        if old_status is not None and old_status not in RETURN_STATUSES:
+            is_sold = old_status in FULFILMENT_STATUSES
+        else:
+            is_sold = was_sold
+        new_sale, new_return = contribution(new_status, is_sold)
+        old_sale, old_return = contribution(old_status, was_sold)
+        if (new_sale, new_return) != (old_sale, old_return):
+            factors[order_id] = (day, new_sale - old_sale, new_return - old_return)
+    if not factors:
+        return
+
+    per_seller = defaultdict(lambda: defaultdict(int))
+    per_product = defaultdict(lambda: defaultdict(int))
+    seller_orders = set()
+    for order_id, product_id, seller_id, quantity, price in _seller_lines(factors):
+        day, sale, returned = factors[order_id]
+        amount = price * quantity
+        for facts in (per_seller[seller_id, day], per_product[seller_id, product_id, day]):
+            facts['units'] += sale * quantity
+            facts['revenue'] += sale * amount
+            facts['returned_units'] += returned * quantity
+            facts['returned_revenue'] += returned * amount
+        if (order_id, seller_id) not in seller_orders:
+            seller_orders.add((order_id, seller_id))
+            per_seller[seller_id, day]['orders'] += sale
+            per_seller[seller_id, day]['returned_orders'] += returned
+
+    with transaction.atomic():
+        for (seller_id, day), facts in per_seller.items():
+            _apply(SellerDailyStats, {'seller_id': seller_id, 'date': day}, facts)
+        for (seller_id, product_id, day), facts in per_product.items():
+            _apply(SellerProductDailyStats, {'seller_id': seller_id, 'product_id': product_id, 'date': day}, facts)
+
+
+def _apply(model, key, facts):
+    deltas = {field: delta for field, delta in facts.items() if delta}
+    if deltas:
+        add_to_row(
+            model.objects.filter(**key),
+            {field: F(field) + delta for field, delta in deltas.items()},
+            key if any(delta > 0 for delta in deltas.values()) else None,
+        )
+
+
+def rebuild_seller_stats(seller_ids=None):
+    """Recompute the seller facts from order lines; returns rows written"""
+    items = OrderItem.objects.filter(
+        product__isnull=False, seller__isnull=False, order__order_status__in=SALE_STATUSES,
+    ).exclude(Q(order__order_status__in=RETURN_STATUSES) & _cancelled_first(OuterRef('order_id')))
+    seller_stats = SellerDailyStats.objects.all()
+    product_stats = SellerProductDailyStats.objects.all()
+    if seller_ids is not None:
+        items = items.filter(seller_id__in=seller_ids)
+        seller_stats = seller_stats.filter(seller_id__in=seller_ids)
+        product_stats = product_stats.filter(seller_id__in=seller_ids)
+
+    returned = Q(order__order_status__in=RETURN_STATUSES)
+    items = items.order_by().annotate(date=TruncDate('order__created_at'))
+    line_facts = {
+        'units': Sum('quantity'),
+        'revenue': Sum(LINE_TOTAL),
+        'returned_units': Sum('quantity', filter=returned, default=0),
+        'returned_revenue': Sum(LINE_TOTAL, filter=returned, default=0),
+    }
+    seller_rows = items.values('seller_id', 'date').annotate(
+        orders=Count('order_id', distinct=True),
+        returned_orders=Count('order_id', distinct=True, filter=returned),
+        **line_facts,
+    )
+    product_rows = items.values('seller_id', 'product_id', 'date').annotate(**line_facts)
+
+    with transaction.atomic():
+        seller_stats.delete()
+        product_stats.delete()
+        created = SellerDailyStats.objects.bulk_create(
+            [SellerDailyStats(**row) for row in seller_rows], batch_size=1000
+        )
+        created += SellerProductDailyStats.objects.bulk_create(
+            [SellerProductDailyStats(**row) for row in product_rows], batch_size=1000
+        )
+    return len(created)
+
+
+def seller_summary(seller):
+    """Lifetime totals for one seller"""
+    totals = SellerDailyStats.objects.filter(seller=seller).aggregate(
+        orders=Sum('orders', default=0),
+        units=Sum('units', default=0),
+        revenue=Sum('revenue', default=Decimal('0')),
+        returned_orders=Sum('returned_orders', default=0),
+        returned_revenue=Sum('returned_revenue', default=Decimal('0')),
+    )
+    totals['net_revenue'] = totals['revenue'] - totals['returned_revenue']
+    return totals
+
+
+def seller_series(seller, days=30):
+    """
+    One point per day for the last `days` days (today included), with
+    zero-filled gaps and each day's revenue as a percentage of the best
+    day for drawing bars.
+    """
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    rows = {
+        row['date']: row for row in
+        SellerDailyStats.objects.filter(seller=seller, date__gte=start)
+        .values('date', 'orders', 'units', 'revenue', 'returned_revenue')
+    }
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = rows.get(day, {})
+        series.append({
+            'date': day,
+            'orders': row.get('orders', 0),
+            'units': row.get('units', 0),
+            'revenue': row.get('revenue', Decimal('0')),
+            'returned_revenue': row.get('returned_revenue', Decimal('0')),
+        })
+    peak = max((point['revenue'] for point in series), default=0)
+    for point in series:
+        point['height'] = round(point['revenue'] * 100 / peak) if peak else 0
+    return series
+
+
+def top_products(seller, days=30, limit=TOP_PRODUCTS):
+    """The seller's best products by gross revenue over the last `days` days"""
+    start = timezone.localdate() - timedelta(days=days - 1)
+    return list(
+        SellerProductDailyStats.objects.filter(seller=seller, date__gte=start)
+        .values('product_id', 'product__name')
+        .annotate(
+            units_sold=Sum('units'),
+            gross_revenue=Sum('revenue'),
+            refunded=Sum('returned_revenue'),
+        )
+        .order_by('-gross_revenue', '-units_sold')[:limit]
+    )
@@ -0,0 +1,146 @@
+from collections import defaultdict
+
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from orders.models import Order, OrderItem
+from orders.signals import orders_transitioned
+from products.models import Product
+from products.signals import products_bulk_saved
+from .rollups import (
+    add_growth, add_order_stats, add_order_stats_deltas, day_of, rebuild_growth_stats, rebuild_order_stats,
+)
+from .sellers import apply_order_changes, rebuild_seller_stats
+
+ORDER_STATS_FIELDS = {'created_at', 'order_status', 'payment_status', 'final_amount'}
+UNKNOWN = object()
+
+
+def _order_stats_key(order):
+    return (day_of(order.created_at), order.order_status, order.payment_status)
+
+
+# Orders
+
+@receiver(post_init, sender=Order)
+def remember_order_stats(sender, instance, **kwargs):
+    if not instance.pk:
+        instance._loaded_stats = None
+    elif ORDER_STATS_FIELDS & instance.get_deferred_fields():
+        instance._loaded_stats = UNKNOWN
+    else:
+        instance._loaded_stats = (_order_stats_key(instance), instance.final_amount)
+
+
+@receiver(post_save, sender=Order)
+def update_order_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = (_order_stats_key(instance), instance.final_amount)
+    previous = None if created else instance._loaded_stats
+    if previous is UNKNOWN:
+        rebuild_order_stats([day_of(instance.created_at)])
+        rebuild_seller_stats(_sellers_of(instance))
+    elif previous != current:
+        if previous is not None:
+            add_order_stats(*previous[0], -1, -previous[1])
+        add_order_stats(*current[0], 1, current[1])
+        old_status = previous[0][1] if previous else None
+        apply_order_changes({instance.pk: (current[0][0], old_status, instance.order_status)})
+    instance._loaded_stats = current
+
+
+def _sellers_of(order):
+    return set(
+        OrderItem.objects.filter(order=order, product__isnull=False)
+        .values_list('seller_id', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Order)
+def remove_from_seller_stats(sender, instance, **kwargs):
+    if instance._loaded_stats is UNKNOWN:
+        instance.refresh_from_db(fields=instance.get_deferred_fields())
+        instance._loaded_stats = (_order_stats_key(instance), instance.final_amount)
+    # The order's lines are still there until the cascade runs
+    key = instance._loaded_stats[0]
+    apply_order_changes({instance.pk: (key[0], key[1], None)})
+
+
+@receiver(post_delete, sender=Order)
+def remove_from_order_stats(sender, instance, **kwargs):
+    key, amount = instance._loaded_stats or (_order_stats_key(instance), instance.final_amount)
+    add_order_stats(*key, -1, -amount)
+
+
+@receiver(orders_transitioned, sender=Order)
+def update_order_stats_after_transition(sender, orders, previous, **kwargs):
+    """Bulk status changes skip post_save; apply their deltas per bucket"""
+    deltas = defaultdict(lambda: [0, 0])
+    seller_changes = {}
+    for order in orders:
+        old_status, old_payment_status = previous[order.pk]
+        day = day_of(order.created_at)
+        seller_changes[order.pk] = (day, old_status, order.order_status)
+        for key, sign in (((day, old_status, old_payment_status), -1), (_order_stats_key(order), 1)):
+            deltas[key][0] += sign
+            deltas[key][1] += sign * order.final_amount
+        order._loaded_stats = (_order_stats_key(order), order.final_amount)
+    add_order_stats_deltas({key: delta for key, delta in deltas.items() if delta[0] or delta[1]})
+    apply_order_changes(seller_changes)
+
+
+# Users and products
+
+@receiver(post_init, sender=User)
+def remember_seller_flag(sender, instance, **kwargs):
+    if not instance.pk:
+        instance._loaded_is_seller = None
+    elif {'created_at', 'is_seller'} & instance.get_deferred_fields():
+        instance._loaded_is_seller = UNKNOWN
+    else:
+        instance._loaded_is_seller = instance.is_seller
+
+
+@receiver(post_save, sender=User)
+def update_user_growth(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    day = day_of(instance.created_at)
+    if created:
+        add_growth(day, new_users=1, new_sellers=int(instance.is_seller))
+    elif instance._loaded_is_seller is UNKNOWN:
+        rebuild_growth_stats([day])
+    elif instance._loaded_is_seller != instance.is_seller:
+        add_growth(day, new_sellers=1 if instance.is_seller else -1)
+    instance._loaded_is_seller = instance.is_seller
+
+
+@receiver(pre_delete, sender=User)
+def load_growth_fields(sender, instance, **kwargs):
+    if instance._loaded_is_seller is UNKNOWN:
+        instance.refresh_from_db(fields=instance.get_deferred_fields())
+        instance._loaded_is_seller = instance.is_seller
+
+
+@receiver(post_delete, sender=User)
+def remove_user_growth(sender, instance, **kwargs):
+    was_seller = instance.is_seller if instance._loaded_is_seller is None else instance._loaded_is_seller
+    add_growth(day_of(instance.created_at), new_users=-1, new_sellers=-int(was_seller))
+
+
+@receiver(post_save, sender=Product)
+def add_product_growth(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_growth(day_of(instance.created_at), new_products=1)
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_growth(sender, instance, **kwargs):
+    add_growth(day_of(instance.created_at), new_products=-1)
+
+
+@receiver(products_bulk_saved)
+def add_bulk_product_growth(sender, created, **kwargs):
+    add_growth(day_of(None), new_products=len(created))
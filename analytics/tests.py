@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounts.models import User
+from cart.models import Cart, CartItem
+from orders.models import Address, Order
+from orders.services import place_order
+from orders.workflow import transition_order, transition_orders
+from products.models import Category, Product
+from .models import SellerDailyStats, SellerProductDailyStats
+from .sellers import rebuild_seller_stats, seller_summary
+
+
+class SellerFactTests(TestCase):
+    """Deltas applied on status changes match a rebuild from the order lines"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'x', is_seller=True)
+        cls.other_seller = User.objects.create_user('other', 'other@example.com', 'x', is_seller=True)
+        cls.customer = User.objects.create_user('customer', 'customer@example.com', 'x')
+        cls.category = Category.objects.create(name='Footwear')
+        cls.address = Address.objects.create(
+            user=cls.customer, name='Customer', phone='9999999999', address='1 Street',
+            city='Pune', state='MH', pincode='411001',
+        )
+
+    def setUp(self):
+        self.shoes = Product.objects.create(
+            seller=self.seller, category=self.category, name='Canvas Shoes',
+            description='Shoes', price=65, stock=100,
+        )
+        self.laces = Product.objects.create(
+            seller=self.seller, category=self.category, name='Laces',
+            description='Laces', price=10, stock=100,
+        )
+        self.boots = Product.objects.create(
+            seller=self.other_seller, category=self.category, name='Boots',
+            description='Boots', price=200, stock=100,
+        )
+
+    def place(self, *lines):
+        cart, created = Cart.objects.get_or_create(user=self.customer)
+        for product, quantity in lines:
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        return place_order(self.customer, cart, self.address)[0]
+
+    def summary(self, seller=None):
+        totals = seller_summary(seller or self.seller)
+        return (
+            totals['orders'], totals['units'], totals['revenue'],
+            totals['returned_orders'], totals['returned_revenue'],
+        )
+
+    def assertMatchesRebuild(self):
+        def rows():
+            return (
+                sorted(
+                    row for row in SellerDailyStats.objects.values_list(
+                        'seller_id', 'date', 'orders', 'units', 'revenue',
+                        'returned_orders', 'returned_units', 'returned_revenue',
+                    ) if any(row[2:])
+                ),
+                sorted(
+                    row for row in SellerProductDailyStats.objects.values_list(
+                        'seller_id', 'product_id', 'date', 'units', 'revenue', 'returned_units', 'returned_revenue',
+                    ) if any(row[3:])
+                ),
+            )
+        applied = rows()
+        rebuild_seller_stats()
+        self.assertEqual(applied, rows())
+
+    def test_pending_orders_are_not_sales(self):
+        self.place((self.shoes, 2))
+        self.assertEqual(self.summary(), (0, 0, 0, 0, 0))
+
+    def test_confirmed_order_counts_once_per_seller(self):
+        order = self.place((self.shoes, 2), (self.laces, 3), (self.boots, 1))
+        transition_order(order, 'confirmed')
+        self.assertEqual(self.summary(), (1, 5, Decimal('160'), 0, 0))
+        self.assertEqual(self.summary(self.other_seller), (1, 1, Decimal('200'), 0, 0))
+        product_units = dict(
+            SellerProductDailyStats.objects.filter(seller=self.seller).values_list('product_id', 'units')
+        )
+        self.assertEqual(product_units, {self.shoes.pk: 2, self.laces.pk: 3})
+        self.assertMatchesRebuild()
+
+    def test_bulk_transitions_apply_deltas(self):
+        orders = [self.place((self.shoes, 1)) for _ in range(3)]
+        transition_orders([order.pk for order in orders], 'confirmed')
+        transition_orders([orders[0].pk], 'cancelled')
+        self.assertEqual(self.summary(), (2, 2, Decimal('130'), 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_refund_of_a_fulfilled_order_is_a_sale_and_a_return(self):
+        order = self.place((self.shoes, 4))
+        for status in ('confirmed', 'shipped', 'refunded'):
+            transition_order(order, status)
+        self.assertEqual(self.summary(), (1, 4, Decimal('260'), 1, Decimal('260')))
+        self.assertMatchesRebuild()
+
+    def test_refund_of_a_cancelled_order_counts_for_nothing(self):
+        confirmed_first = self.place((self.shoes, 4))
+        for status in ('confirmed', 'cancelled', 'refunded'):
+            transition_order(confirmed_first, status)
+        never_confirmed = self.place((self.shoes, 1))
+        for status in ('cancelled', 'refunded'):
+            transition_order(never_confirmed, status)
+        self.assertEqual(self.summary(), (0, 0, 0, 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_deleting_orders_removes_their_facts(self):
+        refunded = self.place((self.shoes, 2))
+        for status in ('confirmed', 'refunded'):
+            transition_order(refunded, status)
+        cancelled = self.place((self.shoes, 1))
+        for status in ('confirmed', 'cancelled', 'refunded'):
+            transition_order(cancelled, status)
+        kept = self.place((self.laces, 1))
+        transition_order(kept, 'confirmed')
+
+        Order.objects.get(pk=refunded.pk).delete()
+        Order.objects.get(pk=cancelled.pk).delete()
+        self.assertEqual(self.summary(), (1, 1, Decimal('10'), 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_saving_a_status_change_applies_deltas(self):
+        order = self.place((self.shoes, 1))
+        order = Order.objects.get(pk=order.pk)
+        order.order_status = 'confirmed'
+        order.save()
+        self.assertEqual(self.summary(), (1, 1, Decimal('65'), 0, 0))
+        deferred = Order.objects.only('id').get(pk=order.pk)
+        deferred.order_status = 'delivered'
+        deferred.save()
+        self.assertEqual(self.summary(), (1, 1, Decimal('65'), 0, 0))
+        self.assertMatchesRebuild()
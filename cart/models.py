@@ -1,6 +1,26 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
 from django.conf import settings
-from products.models import Product
+from django.utils.functional import cached_property
+from products.models import Product, display_price_expression
+
+
+class CartItemQuerySet(models.QuerySet):
+    def totals(self):
+        """Item count and subtotal in a single aggregate query"""
+        totals = self.aggregate(
+            count=Sum('quantity'),
+            subtotal=Sum(ExpressionWrapper(
+                display_price_expression('product__') * F('quantity'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            )),
+        )
+        return {
+            'count': totals['count'] or 0,
+            'subtotal': totals['subtotal'] or Decimal('0'),
+        }
 
 
 class Cart(models.Model):
@@ -17,16 +37,24 @@ class Cart(models.Model):
     def __str__(self):
         return f'Cart for {self.user.username}'
     
+    @cached_property
+    def totals(self):
+        """Memoized for the lifetime of this instance (one request)"""
+        return self.items.totals()
+    
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.totals['count']
     
     @property
     def subtotal(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.totals['subtotal']
     
     def clear(self):
+        from .utils import invalidate_cart_summary
         self.items.all().delete()
+        self.__dict__.pop('totals', None)
+        invalidate_cart_summary(self.user_id)
 
 
 class CartItem(models.Model):
@@ -37,6 +65,8 @@ class CartItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CartItemQuerySet.as_manager()
+    
     class Meta:
         db_table = 'cart_items'
         verbose_name = 'Cart Item'
@@ -0,0 +1,29 @@
+from django.core.cache import cache
+
+from ecommerce_project import cache_versions
+
+CART_SUMMARY_TIMEOUT = 60 * 5
+
+
+def cart_summary_key(user_id):
+    # Versioned with the catalog so price edits refresh cached subtotals
+    return cache_versions.versioned_key('cart', 'summary', user_id)
+
+
+def get_cart_summary(user):
+    """
+    Item count and subtotal for a user's cart.
+
+    Cached per user; on a miss it is computed with one aggregate query.
+    """
+    key = cart_summary_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        from .models import CartItem
+        summary = CartItem.objects.filter(cart__user=user).totals()
+        cache.set(key, summary, CART_SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_cart_summary(user_id):
+    cache.delete(cart_summary_key(user_id))
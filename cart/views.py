@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.http import JsonResponse
 from products.models import Product
 from .models import Cart, CartItem
+from .utils import get_cart_summary, invalidate_cart_summary
 
 
 def get_or_create_cart(user):
@@ -16,7 +17,7 @@ def get_or_create_cart(user):
 def cart_view(request):
     """Display shopping cart"""
     cart = get_or_create_cart(request.user)
-    cart_items = cart.items.select_related('product').all()
+    cart_items = cart.items.select_related('product__category').all()
     
     context = {
         'cart': cart,
@@ -33,8 +34,8 @@ def add_to_cart(request, product_id):
     
     quantity = int(request.POST.get('quantity', 1))
     
-    if quantity > product.stock:
-        messages.error(request, f'Only {product.stock} items available in stock.')
+    if quantity > product.available_stock:
+        messages.error(request, f'Only {product.available_stock} items available in stock.')
         return redirect('products:product_detail', slug=product.slug)
     
     cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
@@ -44,16 +45,17 @@ def add_to_cart(request, product_id):
     else:
         cart_item.quantity = quantity
     
-    if cart_item.quantity > product.stock:
-        cart_item.quantity = product.stock
+    if cart_item.quantity > product.available_stock:
+        cart_item.quantity = product.available_stock
     
     cart_item.save()
+    invalidate_cart_summary(request.user.pk)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
             'success': True,
             'message': f'{product.name} added to cart',
-            'cart_total': cart.total_items
+            'cart_total': get_cart_summary(request.user)['count']
         })
     
     messages.success(request, f'{product.name} added to cart!')
@@ -63,27 +65,28 @@ def add_to_cart(request, product_id):
 @login_required
 def update_cart_item(request, item_id):
     """Update cart item quantity"""
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
+    cart_item = get_object_or_404(CartItem.objects.select_related('product'), id=item_id, cart__user=request.user)
     
     quantity = int(request.POST.get('quantity', 1))
     
     if quantity <= 0:
         cart_item.delete()
         messages.success(request, 'Item removed from cart.')
-    elif quantity > cart_item.product.stock:
-        messages.error(request, f'Only {cart_item.product.stock} items available.')
+    elif quantity > cart_item.product.available_stock:
+        messages.error(request, f'Only {cart_item.product.available_stock} items available.')
     else:
         cart_item.quantity = quantity
         cart_item.save()
         messages.success(request, 'Cart updated.')
+    invalidate_cart_summary(request.user.pk)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        cart = cart_item.cart
+        summary = get_cart_summary(request.user)
         return JsonResponse({
             'success': True,
             'item_total': float(cart_item.total_price) if cart_item.pk else 0,
-            'cart_subtotal': float(cart.subtotal),
-            'cart_total_items': cart.total_items
+            'cart_subtotal': float(summary['subtotal']),
+            'cart_total_items': summary['count']
         })
     
     return redirect('cart:cart')
@@ -92,17 +95,18 @@ def update_cart_item(request, item_id):
 @login_required
 def remove_from_cart(request, item_id):
     """Remove item from cart"""
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
+    cart_item = get_object_or_404(CartItem.objects.select_related('product'), id=item_id, cart__user=request.user)
     product_name = cart_item.product.name
     cart_item.delete()
+    invalidate_cart_summary(request.user.pk)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        cart = get_or_create_cart(request.user)
+        summary = get_cart_summary(request.user)
         return JsonResponse({
             'success': True,
             'message': f'{product_name} removed from cart',
-            'cart_subtotal': float(cart.subtotal),
-            'cart_total_items': cart.total_items
+            'cart_subtotal': float(summary['subtotal']),
+            'cart_total_items': summary['count']
         })
     
     messages.success(request, f'{product_name} removed from cart.')
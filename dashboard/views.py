@@ -2,14 +2,27 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncDate
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
 
 from accounts.models import User
+from analytics.rollups import dashboard_totals
+from analytics.sellers import SERIES_PERIODS, seller_series, seller_summary, top_products
+from products.bulk import EDITABLE_FIELDS, bulk_edit, import_csv
 from products.models import Product, Category
-from orders.models import Order
+from products.slugs import slug_base, slug_fits
+from orders.models import Order, OrderItem
+from products.pagination import CursorPaginator, InvalidCursor, paginate
+from .exports import stream_export
+from orders.workflow import allowed_transitions, transition_order, transition_orders, InvalidTransition
+
+BULK_ORDER_LIMIT = 1000
+ADMIN_ORDERS_PER_PAGE = 25
+SELLER_ORDERS_PER_PAGE = 20
+BULK_EDIT_PER_PAGE = 50
 
 
 def seller_required(view_func):
@@ -26,45 +39,23 @@ def seller_required(view_func):
 @staff_member_required
 def admin_dashboard(request):
     """Admin dashboard with full access"""
-    # Get statistics
-    total_users = User.objects.count()
-    total_sellers = User.objects.filter(is_seller=True).count()
-    total_products = Product.objects.count()
-    total_orders = Order.objects.count()
-    
-    # Revenue
-    total_revenue = Order.objects.filter(
-        payment_status='paid'
-    ).aggregate(total=Sum('final_amount'))['total'] or 0
-    
-    # Recent orders
+    # Headline numbers come from the daily rollups, not the main tables
+    totals = dashboard_totals(recent_days=30)
+    orders_by_status = totals['orders_by_status']
     recent_orders = Order.objects.select_related('user').order_by('-created_at')[:10]
     
-    # Orders by status
-    pending_orders = Order.objects.filter(order_status='pending').count()
-    confirmed_orders = Order.objects.filter(order_status='confirmed').count()
-    shipped_orders = Order.objects.filter(order_status='shipped').count()
-    delivered_orders = Order.objects.filter(order_status='delivered').count()
-    
-    # Monthly revenue (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    monthly_revenue = Order.objects.filter(
-        payment_status='paid',
-        created_at__gte=thirty_days_ago
-    ).aggregate(total=Sum('final_amount'))['total'] or 0
-    
     context = {
-        'total_users': total_users,
-        'total_sellers': total_sellers,
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'monthly_revenue': monthly_revenue,
+        'total_users': totals['total_users'],
+        'total_sellers': totals['total_sellers'],
+        'total_products': totals['total_products'],
+        'total_orders': totals['total_orders'],
+        'total_revenue': totals['total_revenue'],
+        'monthly_revenue': totals['recent_revenue'],
         'recent_orders': recent_orders,
-        'pending_orders': pending_orders,
-        'confirmed_orders': confirmed_orders,
-        'shipped_orders': shipped_orders,
-        'delivered_orders': delivered_orders,
+        'pending_orders': orders_by_status['pending'],
+        'confirmed_orders': orders_by_status['confirmed'],
+        'shipped_orders': orders_by_status['shipped'],
+        'delivered_orders': orders_by_status['delivered'],
     }
     return render(request, 'dashboard/admin/dashboard.html', context)
 
@@ -73,39 +64,42 @@ def admin_dashboard(request):
 @seller_required
 def seller_dashboard(request):
     """Seller dashboard with limited access"""
-    # Get seller's products
-    seller_products = Product.objects.filter(seller=request.user)
-    total_products = seller_products.count()
-    active_products = seller_products.filter(is_active=True).count()
-    
-    # Get seller's orders (orders containing their products)
-    from orders.models import OrderItem
-    seller_order_items = OrderItem.objects.filter(
-        product__seller=request.user
-    ).select_related('order')
-    
-    seller_orders = Order.objects.filter(
-        items__product__seller=request.user
-    ).distinct()
-    
-    total_orders = seller_orders.count()
-    
-    # Revenue from seller's products
-    total_revenue = seller_order_items.filter(
-        order__payment_status='paid'
-    ).aggregate(total=Sum('price'))['total'] or 0
-    
-    # Recent orders
-    recent_orders = seller_orders.order_by('-created_at')[:10]
+    seller = request.user
+    product_counts = Product.objects.filter(seller=seller).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+    
+    # Sales figures come from the precomputed seller facts (analytics.sellers)
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    if days not in SERIES_PERIODS:
+        days = 30
+    summary = seller_summary(seller)
+    series = seller_series(seller, days)
+    
+    # Recent orders containing the seller's products, without a DISTINCT join
+    seller_order_ids = OrderItem.objects.filter(product__seller=seller).values('order_id')
+    recent_orders = Order.objects.filter(pk__in=seller_order_ids).select_related('user').order_by('-created_at')[:10]
     
     # Low stock products
-    low_stock_products = seller_products.filter(stock__lte=5, is_active=True)
+    low_stock_products = Product.objects.filter(seller=seller, stock__lte=5, is_active=True)
     
     context = {
-        'total_products': total_products,
-        'active_products': active_products,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
+        'total_products': product_counts['total'],
+        'active_products': product_counts['active'],
+        'total_orders': summary['orders'],
+        'total_revenue': summary['revenue'],
+        'summary': summary,
+        'days': days,
+        'periods': SERIES_PERIODS,
+        'series': series,
+        'period_revenue': sum(point['revenue'] for point in series),
+        'period_units': sum(point['units'] for point in series),
+        'period_orders': sum(point['orders'] for point in series),
+        'top_products': top_products(seller, days),
         'recent_orders': recent_orders,
         'low_stock_products': low_stock_products,
     }
@@ -117,8 +111,49 @@ def seller_dashboard(request):
 @staff_member_required
 def admin_users(request):
     """Manage users"""
-    users = User.objects.all().order_by('-created_at')
-    return render(request, 'dashboard/admin/users.html', {'users': users})
+    users, filters = _filter_users(request, User.objects.all())
+    users = users.order_by('-created_at')
+    return render(request, 'dashboard/admin/users.html', {'users': users, 'filters': filters})
+
+
+def _filter_users(request, users):
+    """Apply the admin user list filters; returns (queryset, applied filter values)"""
+    filters = {
+        'role': request.GET.get('role', ''),
+        'status': request.GET.get('status', ''),
+    }
+    if filters['role'] == 'admin':
+        users = users.filter(is_superuser=True)
+    elif filters['role'] == 'seller':
+        users = users.filter(is_seller=True, is_superuser=False)
+    elif filters['role'] == 'customer':
+        users = users.filter(is_seller=False, is_superuser=False)
+    if filters['status'] == 'active':
+        users = users.filter(is_active=True)
+    elif filters['status'] == 'blocked':
+        users = users.filter(is_active=False)
+    return users, filters
+
+
+@login_required
+@staff_member_required
+def admin_export_users(request):
+    """Stream the (filtered) user list as CSV or JSON lines"""
+    users, filters = _filter_users(request, User.objects.all())
+    columns = [
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('phone', 'phone'),
+        ('is_seller', 'is_seller'),
+        ('is_staff', 'is_staff'),
+        ('is_active', 'is_active'),
+        ('created_at', 'created_at'),
+        ('last_login', 'last_login'),
+    ]
+    return stream_export(users.order_by('id'), columns, 'users', request.GET.get('format'))
 
 
 @login_required
@@ -194,14 +229,103 @@ def admin_edit_user(request, user_id):
 @staff_member_required
 def admin_products(request):
     """Manage all products"""
-    products = Product.objects.select_related('category', 'seller').all()
+    products, filters = _filter_products(request, Product.objects.select_related('category', 'seller'))
     categories = Category.objects.all()
     return render(request, 'dashboard/admin/products.html', {
         'products': products,
-        'categories': categories
+        'categories': categories,
+        'filters': filters,
     })
 
 
+def _filter_products(request, products):
+    """Apply the admin product list filters; returns (queryset, applied filter values)"""
+    filters = {
+        'category': request.GET.get('category', ''),
+        'status': request.GET.get('status', ''),
+        'seller': request.GET.get('seller', '').strip(),
+    }
+    if filters['category'].isdigit():
+        products = products.filter(category_id=int(filters['category']))
+    if filters['status'] == 'active':
+        products = products.filter(is_active=True)
+    elif filters['status'] == 'inactive':
+        products = products.filter(is_active=False)
+    if filters['seller']:
+        products = products.filter(seller__username=filters['seller'])
+    return products, filters
+
+
+@login_required
+@staff_member_required
+def admin_export_products(request):
+    """Stream the (filtered) product list as CSV or JSON lines"""
+    products, filters = _filter_products(request, Product.objects.all())
+    columns = [
+        ('id', 'id'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+        ('category', 'category__name'),
+        ('subcategory', 'subcategory__name'),
+        ('seller', 'seller__username'),
+        ('price', 'price'),
+        ('discount_price', 'discount_price'),
+        ('stock', 'stock'),
+        ('reserved_stock', 'reserved_stock'),
+        ('is_active', 'is_active'),
+        ('is_featured', 'is_featured'),
+        ('rating_count', 'rating_count'),
+        ('rating_sum', 'rating_sum'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+    return stream_export(products.order_by('id'), columns, 'products', request.GET.get('format'))
+
+
+@login_required
+@staff_member_required
+def admin_bulk_products(request):
+    """Edit prices, stock and status of many products, or import a CSV"""
+    products, filters = _filter_products(request, Product.objects.all())
+    return _bulk_products(request, products, 'dashboard/admin/bulk_products.html', {
+        'categories': Category.objects.all(),
+        'filters': filters,
+    })
+
+
+def _bulk_products(request, products, template, context):
+    """
+    Shared bulk editor for the admin and seller dashboards.
+
+    products is every product the user may change. A POST with a file
+    imports it and shows the per-row report; any other POST applies the
+    editor grid, whose inputs are named <field>-<product id>.
+    """
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload:
+            context['result'] = import_csv(products, upload, request.user)
+        elif 'product_ids' in request.POST:
+            edits = {
+                int(pk): {field: request.POST.get(f'{field}-{pk}') for field in EDITABLE_FIELDS}
+                for pk in request.POST.getlist('product_ids')[:BULK_EDIT_PER_PAGE] if pk.isdigit()
+            }
+            result = bulk_edit(products, edits, request.user)
+            if result.updated:
+                messages.success(request, f'{result.updated} products updated.')
+            elif not result.error_count:
+                messages.info(request, 'Nothing changed.')
+            for product_id, error in result.errors:
+                messages.error(request, f'Product {product_id}: {error}')
+            return redirect(request.get_full_path())
+        else:
+            messages.error(request, 'Choose a CSV file to import.')
+
+    page = paginate(request, products.select_related('category').order_by('id'), per_page=BULK_EDIT_PER_PAGE)
+    context['products'] = page
+    return render(request, template, context)
+
+
 @login_required
 @staff_member_required
 def admin_add_product(request):
@@ -220,18 +344,9 @@ def admin_add_product(request):
         is_active = request.POST.get('is_active') == '1'
         
         if name and price and category_id:
-            from django.utils.text import slugify
-            slug = slugify(name)
-            counter = 1
-            original_slug = slug
-            while Product.objects.filter(slug=slug).exists():
-                slug = f"{original_slug}-{counter}"
-                counter += 1
-            
             product = Product.objects.create(
                 seller=request.user,
                 name=name,
-                slug=slug,
                 description=description,
                 price=price,
                 discount_price=discount_price,
@@ -272,16 +387,9 @@ def admin_edit_product(request, product_id):
         if request.FILES.get('image'):
             product.image = request.FILES['image']
         
-        # Update slug if name changed
-        from django.utils.text import slugify
-        new_slug = slugify(product.name)
-        if new_slug != product.slug:
-            counter = 1
-            original_slug = new_slug
-            while Product.objects.filter(slug=new_slug).exclude(id=product.id).exists():
-                new_slug = f"{original_slug}-{counter}"
-                counter += 1
-            product.slug = new_slug
+        # A renamed product gets a new slug on save
+        if not slug_fits(product.slug, slug_base(product)):
+            product.slug = ''
         
         product.save()
         messages.success(request, f'Product "{product.name}" updated successfully!')
@@ -322,9 +430,105 @@ def admin_view_product(request, product_id):
 @login_required
 @staff_member_required
 def admin_orders(request):
-    """Manage all orders"""
-    orders = Order.objects.select_related('user', 'address').prefetch_related('items').all()
-    return render(request, 'dashboard/admin/orders.html', {'orders': orders})
+    """Manage all orders, filtered and paged on the server"""
+    orders, filters = _filter_orders(request, Order.objects.all())
+    # Correlated subqueries rather than a JOIN + GROUP BY, so the page's
+    # COUNT(*) can drop them and stays a plain index count
+    per_order = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    orders = orders.select_related('user').annotate(
+        item_count=Coalesce(
+            Subquery(per_order.annotate(c=Count('id')).values('c'), output_field=IntegerField()), 0
+        ),
+        item_quantity=Coalesce(
+            Subquery(per_order.annotate(q=Sum('quantity')).values('q'), output_field=IntegerField()), 0
+        ),
+    ).order_by('-created_at', '-id')
+    page = paginate(request, orders, per_page=ADMIN_ORDERS_PER_PAGE)
+
+    labels = dict(Order.STATUS_CHOICES)
+    for order in page:
+        order.next_statuses = [(status, labels[status]) for status in allowed_transitions(order.order_status)]
+    context = {
+        'orders': page,
+        'filters': filters,
+        'status_choices': Order.STATUS_CHOICES,
+        'payment_status_choices': Order.PAYMENT_STATUS_CHOICES,
+    }
+    return render(request, 'dashboard/admin/orders.html', context)
+
+
+def _day_start(value):
+    """Aware datetime for the start of a YYYY-MM-DD day, or None"""
+    day = parse_date(value) if value else None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _filter_orders(request, orders):
+    """
+    Apply the admin order list filters from the query string.
+
+    Every filter is an equality or a range on an indexed Order column
+    (see Order.Meta.indexes), so the filtered, date-ordered listing stays
+    an index range scan. Returns (queryset, applied filter values).
+    """
+    filters = {
+        'status': request.GET.get('status', ''),
+        'payment_status': request.GET.get('payment_status', ''),
+        'date_from': request.GET.get('date_from', ''),
+        'date_to': request.GET.get('date_to', ''),
+        'user': request.GET.get('user', '').strip(),
+    }
+
+    if filters['status'] in dict(Order.STATUS_CHOICES):
+        orders = orders.filter(order_status=filters['status'])
+    if filters['payment_status'] in dict(Order.PAYMENT_STATUS_CHOICES):
+        orders = orders.filter(payment_status=filters['payment_status'])
+
+    # Compare the raw column against day boundaries rather than created_at__date
+    date_from = _day_start(filters['date_from'])
+    if date_from:
+        orders = orders.filter(created_at__gte=date_from)
+    date_to = _day_start(filters['date_to'])
+    if date_to:
+        orders = orders.filter(created_at__lt=date_to + timedelta(days=1))
+
+    user = filters['user']
+    if user:
+        if user.isdigit():
+            orders = orders.filter(user_id=int(user))
+        else:
+            # username and email are both unique, so this resolves to one user id
+            orders = orders.filter(user__in=User.objects.filter(Q(username=user) | Q(email=user)).values('pk'))
+
+    return orders, filters
+
+
+@login_required
+@staff_member_required
+def admin_export_orders(request):
+    """Stream the (filtered) orders as CSV or JSON lines, one row per order line"""
+    orders, filters = _filter_orders(request, Order.objects.all())
+    columns = [
+        ('order_number', 'order_number'),
+        ('created_at', 'created_at'),
+        ('user_id', 'user_id'),
+        ('username', 'user__username'),
+        ('email', 'user__email'),
+        ('order_status', 'order_status'),
+        ('payment_status', 'payment_status'),
+        ('total_amount', 'total_amount'),
+        ('discount_amount', 'discount_amount'),
+        ('final_amount', 'final_amount'),
+        ('product_id', 'items__product_id'),
+        ('product_name', 'items__product_name'),
+        ('quantity', 'items__quantity'),
+        ('price', 'items__price'),
+    ]
+    # Same order as the list page; the LEFT JOIN keeps orders without lines
+    orders = orders.order_by('-created_at', '-id', 'items__id')
+    return stream_export(orders, columns, 'orders', request.GET.get('format'))
 
 
 @login_required
@@ -334,10 +538,35 @@ def admin_update_order_status(request, order_id):
     if request.method == 'POST':
         order = get_object_or_404(Order, id=order_id)
         new_status = request.POST.get('status')
-        if new_status in dict(Order.STATUS_CHOICES):
-            order.order_status = new_status
-            order.save()
+        try:
+            transition_order(order, new_status, user=request.user)
             messages.success(request, f'Order {order.order_number} status updated to {new_status}.')
+        except InvalidTransition as e:
+            messages.error(request, str(e))
+    return redirect('dashboard:admin_orders')
+
+
+@login_required
+@staff_member_required
+def admin_bulk_update_order_status(request):
+    """Move many orders to one status in a single request"""
+    if request.method == 'POST':
+        new_status = request.POST.get('status')
+        order_ids = [int(pk) for pk in request.POST.getlist('order_ids') if pk.isdigit()][:BULK_ORDER_LIMIT]
+        if not order_ids:
+            messages.error(request, 'Select at least one order.')
+        else:
+            try:
+                moved, skipped = transition_orders(order_ids, new_status, user=request.user)
+            except InvalidTransition as e:
+                messages.error(request, str(e))
+            else:
+                if moved:
+                    messages.success(request, f'{len(moved)} orders updated to {new_status}.')
+                if skipped:
+                    numbers = ', '.join(order.order_number for order in skipped[:10])
+                    more = f' and {len(skipped) - 10} more' if len(skipped) > 10 else ''
+                    messages.warning(request, f'{len(skipped)} orders can\'t move to {new_status}: {numbers}{more}.')
     return redirect('dashboard:admin_orders')
 
 
@@ -361,18 +590,8 @@ def admin_add_category(request):
         is_active = request.POST.get('is_active') == '1'
         
         if name:
-            from django.utils.text import slugify
-            slug = slugify(name)
-            # Make slug unique
-            counter = 1
-            original_slug = slug
-            while Category.objects.filter(slug=slug).exists():
-                slug = f"{original_slug}-{counter}"
-                counter += 1
-            
             category = Category.objects.create(
                 name=name,
-                slug=slug,
                 image=image,
                 is_active=is_active
             )
@@ -397,16 +616,9 @@ def admin_edit_category(request, category_id):
         if request.FILES.get('image'):
             category.image = request.FILES['image']
         
-        # Update slug if name changed
-        from django.utils.text import slugify
-        new_slug = slugify(category.name)
-        if new_slug != category.slug:
-            counter = 1
-            original_slug = new_slug
-            while Category.objects.filter(slug=new_slug).exclude(id=category.id).exists():
-                new_slug = f"{original_slug}-{counter}"
-                counter += 1
-            category.slug = new_slug
+        # A renamed category gets a new slug on save
+        if not slug_fits(category.slug, slug_base(category)):
+            category.slug = ''
         
         category.save()
         messages.success(request, f'Category "{category.name}" updated successfully!')
@@ -441,17 +653,8 @@ def admin_add_subcategory(request):
         is_active = request.POST.get('is_active') == '1'
         
         if name and category_id:
-            from django.utils.text import slugify
-            slug = slugify(name)
-            counter = 1
-            original_slug = slug
-            while SubCategory.objects.filter(slug=slug).exists():
-                slug = f"{original_slug}-{counter}"
-                counter += 1
-            
             SubCategory.objects.create(
                 name=name,
-                slug=slug,
                 category_id=category_id,
                 is_active=is_active
             )
@@ -556,15 +759,43 @@ def seller_products(request):
     return render(request, 'dashboard/seller/products.html', {'products': products})
 
 
+@login_required
+@seller_required
+def seller_bulk_products(request):
+    """Edit prices, stock and status of the seller's products, or import a CSV"""
+    products = Product.objects.filter(seller=request.user)
+    return _bulk_products(request, products, 'dashboard/seller/bulk_products.html', {})
+
+
 @login_required
 @seller_required
 def seller_orders(request):
-    """Seller's orders"""
-    from orders.models import OrderItem
-    order_items = OrderItem.objects.filter(
-        product__seller=request.user
-    ).select_related('order', 'product').order_by('-order__created_at')
-    return render(request, 'dashboard/seller/orders.html', {'order_items': order_items})
+    """Seller's orders, newest first, one keyset page at a time"""
+    seller = request.user
+    seller_items = OrderItem.objects.filter(seller=seller)
+    # The keyset walks the seller's own lines (order_items_seller_feed_idx),
+    # one row per order, so a page never reads other sellers' orders
+    order_keys = seller_items.values('created_at', 'order_id').distinct()
+    status = request.GET.get('status', '')
+    if status in dict(Order.STATUS_CHOICES):
+        order_keys = order_keys.filter(order__order_status=status)
+    
+    paginator = CursorPaginator(order_keys, SELLER_ORDERS_PER_PAGE, keys=[('created_at', True), ('order_id', True)])
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page = paginator.page()
+    
+    orders = Order.objects.select_related('user').prefetch_related(
+        Prefetch('items', queryset=seller_items.select_related('product'), to_attr='seller_items')
+    ).in_bulk([row['order_id'] for row in page])
+    page.object_list = [orders[row['order_id']] for row in page]
+    
+    return render(request, 'dashboard/seller/orders.html', {
+        'orders': page,
+        'status': status,
+        'status_choices': Order.STATUS_CHOICES,
+    })
 
 
 @login_required
@@ -625,6 +856,10 @@ def seller_edit_product(request, product_id):
         if request.FILES.get('image'):
             product.image = request.FILES['image']
         
+        # A renamed product gets a new slug on save
+        if not slug_fits(product.slug, slug_base(product)):
+            product.slug = ''
+        
         product.save()
         messages.success(request, 'Product updated successfully!')
         return redirect('dashboard:seller_products')
@@ -0,0 +1,80 @@
+"""
+Cache version registry - IndiVibe E-Commerce
+
+Apps build cache keys with versioned_key(namespace, ...) and call
+bump(namespace) after writes. A namespace's effective version includes the
+versions of the namespaces it depends on, so bumping 'catalog' also
+invalidates facet counts and cart summaries built from catalog data.
+Versions live in the default cache. With CACHE_BACKEND=redis (or file)
+every worker sees the same versions; with the per-process locmem default
+a bump only reaches the worker that made it, so run several workers on a
+shared backend.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import caches
+
+# namespace -> namespaces it depends on
+NAMESPACES = {
+    'catalog': (),
+    'facets': ('catalog',),
+    'cart': ('catalog',),
+    'orders': (),
+    'dashboard': ('orders',),
+}
+
+VERSION_CACHE = 'default'
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def _seed():
+    return int(time.time() * 1000)
+
+
+def _chain(namespace):
+    if namespace not in NAMESPACES:
+        raise KeyError(f'Unknown cache namespace: {namespace}')
+    chain = [namespace]
+    for parent in NAMESPACES[namespace]:
+        chain.extend(n for n in _chain(parent) if n not in chain)
+    return chain
+
+
+def get_version(namespace):
+    """Effective version string of a namespace, in one cache round trip"""
+    cache = caches[VERSION_CACHE]
+    chain = _chain(namespace)
+    found = cache.get_many([_version_key(n) for n in chain])
+    versions = []
+    for n in chain:
+        value = found.get(_version_key(n))
+        if value is None:
+            # Seeded from the clock so an evicted version never repeats
+            cache.add(_version_key(n), _seed(), None)
+            value = cache.get(_version_key(n))
+        versions.append(str(value))
+    return '.'.join(versions)
+
+
+def bump(*namespaces):
+    """Invalidate every key built in these namespaces (and their dependants)"""
+    cache = caches[VERSION_CACHE]
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _seed(), None)
+
+
+def versioned_key(namespace, *parts):
+    """Cache key for `parts` under the namespace's current version"""
+    raw = ':'.join(str(part) for part in parts)
+    if len(raw) > 200:
+        raw = hashlib.md5(raw.encode()).hexdigest()
+    return f'{namespace}:{get_version(namespace)}:{raw}'
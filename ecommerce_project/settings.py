@@ -41,6 +41,8 @@ INSTALLED_APPS = [
     'invoices',
     'notifications',
     'dashboard',
+    'inventory',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -69,6 +71,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'cart.context_processors.cart_count',
                 'wishlist.context_processors.wishlist_count',
+                'products.context_processors.catalog_version',
             ],
         },
     },
@@ -84,6 +87,56 @@ DATABASES = {
     )
 }
 
+# Cache
+# CACHE_BACKEND selects locmem (default, per process), file, redis (shared
+# across gunicorn workers, set CACHE_URL) or fakeredis (in-process Redis
+# stand-in for tests, needs the fakeredis package).
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_URL = config('CACHE_URL', default='redis://127.0.0.1:6379/0')
+CACHE_DIR = config('CACHE_DIR', default=str(BASE_DIR / '.cache'))
+
+if CACHE_BACKEND == 'fakeredis':
+    import fakeredis
+    _fake_redis_server = fakeredis.FakeServer()
+
+
+def cache_config(alias, timeout=300):
+    """CACHES entry for a named cache on the selected backend"""
+    if CACHE_BACKEND in ('redis', 'fakeredis'):
+        options = {}
+        if CACHE_BACKEND == 'fakeredis':
+            options = {'connection_class': fakeredis.FakeConnection, 'server': _fake_redis_server}
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': alias,
+            'TIMEOUT': timeout,
+            'OPTIONS': options,
+        }
+    if CACHE_BACKEND == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, alias),
+            'TIMEOUT': timeout,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': alias,
+        'TIMEOUT': timeout,
+    }
+
+
+CACHES = {
+    'default': cache_config('default'),
+    # Catalog pages, product card fragments, facet counts
+    'catalog': cache_config('catalog', timeout=60 * 10),
+    'sessions': cache_config('sessions', timeout=60 * 60 * 24 * 14),
+}
+
+# Sessions are read from the cache and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -140,13 +193,50 @@ LOGOUT_REDIRECT_URL = 'home'
 RAZORPAY_KEY_ID = config('RAZORPAY_KEY_ID', default='')
 RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='')
 
+# How long checkout holds stock for an unpaid order
+STOCK_RESERVATION_MINUTES = config('STOCK_RESERVATION_MINUTES', default=15, cast=int)
+
 # Email Settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Emails are queued and sent by `manage.py send_queued_email`; use
+# django.core.mail.backends.locmem.EmailBackend to keep them in memory
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # Set PRODUCTS_LOG_LEVEL=DEBUG to trace every catalog listing request
+        'products': {
+            'handlers': ['console'],
+            'level': config('PRODUCTS_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+        # Payments captured for orders that can't take them (refunds to issue)
+        'payments': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        # Orders committed or released against stock that had been edited away
+        'inventory': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
 
 CSRF_TRUSTED_ORIGINS = [
     "https://e-commerce-production-faad.up.railway.app"
@@ -7,10 +7,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
+from products.caching import cache_anonymous_page
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', TemplateView.as_view(template_name='home.html'), name='home'),
+    path('', cache_anonymous_page(TemplateView.as_view(template_name='home.html')), name='home'),
     path('accounts/', include('accounts.urls')),
     path('products/', include('products.urls')),
     path('wishlist/', include('wishlist.urls')),
@@ -0,0 +1,25 @@
+from django.contrib import admin
+from .models import StockMovement, StockReservation
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('product', 'change', 'reason', 'order', 'created_by', 'created_at')
+    list_filter = ('reason', 'created_at')
+    search_fields = ('product__name', 'order__order_number')
+    raw_id_fields = ('product', 'order', 'created_by')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('order', 'product', 'quantity', 'status', 'expires_at', 'created_at')
+    list_filter = ('status', 'expires_at')
+    search_fields = ('product__name', 'order__order_number')
+    raw_id_fields = ('product', 'order')
+    readonly_fields = ('product', 'order', 'quantity', 'status', 'expires_at')
@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-18 18:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    """Start the ledger from current stock so it sums to Product.stock"""
+    Product = apps.get_model('products', 'Product')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    logged = dict(
+        StockMovement.objects.order_by().values('product_id')
+        .annotate(total=models.Sum('change')).values_list('product_id', 'total')
+    )
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(product_id=pk, change=stock - logged.get(pk, 0), reason='opening')
+            for pk, stock in Product.objects.values_list('pk', 'stock').iterator()
+            if stock != logged.get(pk, 0)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+        ('orders', '0003_order_history_summary'),
+        ('products', '0009_product_reserved_stock'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockmovement',
+            name='reason',
+            field=models.CharField(choices=[('opening', 'Opening Balance'), ('sale', 'Sale'), ('cancellation', 'Order Cancelled'), ('refund', 'Order Refunded'), ('adjustment', 'Manual Adjustment')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('active', 'Active'), ('committed', 'Committed'), ('released', 'Released')], default='active', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='orders.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'db_table': 'stock_reservations',
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='stock_reservations_expiry_idx'), models.Index(fields=['order', 'status'], name='stock_reservations_order_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+from django.db import models
+from django.conf import settings
+from products.models import Product
+
+
+class StockMovement(models.Model):
+    """Append-only ledger of every change to a product's stock"""
+    REASON_CHOICES = [
+        ('opening', 'Opening Balance'),
+        ('sale', 'Sale'),
+        ('cancellation', 'Order Cancelled'),
+        ('refund', 'Order Refunded'),
+        ('adjustment', 'Manual Adjustment'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, related_name='stock_movements')
+    change = models.IntegerField()  # positive adds stock, negative takes it
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    order = models.ForeignKey('orders.Order', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stock_movements'
+        verbose_name = 'Stock Movement'
+        verbose_name_plural = 'Stock Movements'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', '-created_at'], name='stock_movements_product_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id}: {self.change:+d} ({self.reason})'
+
+
+class StockReservation(models.Model):
+    """Stock held for an unpaid order until it is paid, cancelled or expires"""
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name='stock_reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stock_reservations'
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='stock_reservations_expiry_idx'),
+            models.Index(fields=['order', 'status'], name='stock_reservations_order_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.quantity} x {self.product_id} for order {self.order_id} ({self.status})'
@@ -0,0 +1,194 @@
+"""
+Inventory - IndiVibe E-Commerce
+
+Product.stock is what is on hand and Product.reserved_stock what unpaid
+orders are holding; available_stock is the difference, so checking it
+costs nothing. Every change to stock is written to the StockMovement
+ledger. Checkout only reserves: one conditional UPDATE bumps
+reserved_stock where enough is available, without holding product row
+locks through the payment. Paying commits the reservation (stock and
+reserved both go down, 'sale' movement); payment failure, cancellation
+or expiry releases it. Commits and releases lock the products they touch
+and never take a level below zero: if stock was edited down below what
+was reserved, only what is there is taken, the ledger records that
+amount, and the shortfall is logged for staff.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+
+from products.models import Product
+from .models import StockMovement, StockReservation
+
+logger = logging.getLogger('inventory')
+
+
+class OutOfStockError(Exception):
+    """Raised when one or more cart lines can't be fulfilled"""
+
+    def __init__(self, lines=()):
+        self.lines = list(lines)  # (product_name, requested, available)
+        names = ', '.join(name for name, requested, available in self.lines)
+        super().__init__(f'Not enough stock for: {names}' if names else 'Not enough stock')
+
+
+def _per_product(field, deltas):
+    """CASE expression adding deltas[pk] to `field` of each product"""
+    whens = [When(pk=pk, then=F(field) + delta) for pk, delta in deltas.items()]
+    return Case(*whens, default=F(field), output_field=PositiveIntegerField())
+
+
+def _totals(lines):
+    """{product_id: quantity} and {(order_id, product_id): quantity} from lines"""
+    per_product, per_line = {}, {}
+    for order_id, product_id, quantity in lines:
+        if product_id is None or not quantity:
+            continue
+        per_product[product_id] = per_product.get(product_id, 0) + quantity
+        per_line[order_id, product_id] = per_line.get((order_id, product_id), 0) + quantity
+    return per_product, per_line
+
+
+def _locked_levels(product_ids):
+    """Lock the products (in pk order) and return {pk: (stock, reserved_stock)}"""
+    return {
+        pk: (stock, reserved)
+        for pk, stock, reserved in Product.objects.select_for_update()
+        .filter(pk__in=product_ids).order_by('pk')
+        .values_list('pk', 'stock', 'reserved_stock')
+    }
+
+
+def _take(available, per_line):
+    """
+    Take each line's quantity out of available ({product_id: amount}),
+    stopping at zero. Returns what was taken per line and per product,
+    and the units each product came up short.
+    """
+    available = dict(available)
+    taken_lines, taken, short = {}, {}, {}
+    for (order_id, product_id), quantity in per_line.items():
+        amount = min(quantity, available.get(product_id, 0))
+        available[product_id] = available.get(product_id, 0) - amount
+        taken_lines[order_id, product_id] = amount
+        taken[product_id] = taken.get(product_id, 0) + amount
+        if amount < quantity:
+            short[product_id] = short.get(product_id, 0) + quantity - amount
+    return taken_lines, taken, short
+
+
+def restock(lines, reason, user=None):
+    """
+    Put (order_id, product_id, quantity) lines back on the shelf.
+
+    One UPDATE adds to every product's stock in the database, so it can't
+    lose a concurrent checkout's decrement, and one INSERT writes a ledger
+    row per order and product.
+    """
+    per_product, per_line = _totals(lines)
+    if not per_product:
+        return
+    with transaction.atomic():
+        Product.objects.filter(pk__in=per_product).update(stock=_per_product('stock', per_product))
+        StockMovement.objects.bulk_create([
+            StockMovement(product_id=product_id, change=quantity, reason=reason, order_id=order_id, created_by=user)
+            for (order_id, product_id), quantity in per_line.items()
+        ])
+
+
+def reserve_stock(order, quantities):
+    """
+    Hold {product_id: quantity} for an unpaid order.
+
+    Each product row only matches while its available stock covers the
+    request, so a short row makes the affected count come up short and
+    OutOfStockError rolls back the caller's transaction.
+    """
+    quantities = {pk: quantity for pk, quantity in quantities.items() if quantity}
+    if not quantities:
+        return
+    condition = Q()
+    for pk, quantity in quantities.items():
+        condition |= Q(pk=pk, stock__gte=F('reserved_stock') + quantity)
+    updated = Product.objects.filter(condition).update(
+        reserved_stock=_per_product('reserved_stock', quantities)
+    )
+    if updated != len(quantities):
+        raise OutOfStockError()
+
+    expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)
+    StockReservation.objects.bulk_create([
+        StockReservation(product_id=pk, order=order, quantity=quantity, expires_at=expires_at)
+        for pk, quantity in quantities.items()
+    ])
+
+
+def _active_reservations(order_ids):
+    # Row locks on the reservations make a repeated commit/release a no-op
+    return list(
+        StockReservation.objects.select_for_update()
+        .filter(order_id__in=order_ids, status='active')
+        .order_by('pk')
+    )
+
+
+def commit_reservations(order_ids, user=None):
+    """Turn the stock held for these orders into sales; returns the order ids committed"""
+    with transaction.atomic():
+        reservations = _active_reservations(order_ids)
+        if not reservations:
+            return set()
+        per_product, per_line = _totals((r.order_id, r.product_id, r.quantity) for r in reservations)
+        levels = _locked_levels(per_product)
+        sold_lines, sold, short = _take({pk: stock for pk, (stock, reserved) in levels.items()}, per_line)
+        unheld, unreserved = _take({pk: reserved for pk, (stock, reserved) in levels.items()}, per_line)[1:]
+        Product.objects.filter(pk__in=per_product).update(
+            stock=_per_product('stock', {pk: -quantity for pk, quantity in sold.items()}),
+            reserved_stock=_per_product('reserved_stock', {pk: -quantity for pk, quantity in unheld.items()}),
+        )
+        StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+            status='committed', updated_at=timezone.now()
+        )
+        StockMovement.objects.bulk_create([
+            StockMovement(product_id=product_id, change=-quantity, reason='sale', order_id=order_id, created_by=user)
+            for (order_id, product_id), quantity in sold_lines.items() if quantity
+        ])
+    if short:
+        logger.error('Sold more than was in stock (units short by product id): %s', short)
+    if unreserved:
+        logger.warning('Committed more than was reserved (units by product id): %s', unreserved)
+    return {r.order_id for r in reservations}
+
+
+def release_reservations(order_ids):
+    """Give the stock held for these orders back; returns the order ids released"""
+    with transaction.atomic():
+        reservations = _active_reservations(order_ids)
+        if not reservations:
+            return set()
+        per_product, per_line = _totals((r.order_id, r.product_id, r.quantity) for r in reservations)
+        levels = _locked_levels(per_product)
+        unheld, short = _take({pk: reserved for pk, (stock, reserved) in levels.items()}, per_line)[1:]
+        Product.objects.filter(pk__in=per_product).update(
+            reserved_stock=_per_product('reserved_stock', {pk: -quantity for pk, quantity in unheld.items()})
+        )
+        StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+            status='released', updated_at=timezone.now()
+        )
+    if short:
+        logger.warning('Released more than was reserved (units by product id): %s', short)
+    return {r.order_id for r in reservations}
+
+
+def expired_reservation_order_ids(now=None):
+    """Orders still holding stock past their reservation's expiry"""
+    return set(
+        StockReservation.objects
+        .filter(status='active', expires_at__lte=now or timezone.now())
+        .values_list('order_id', flat=True)
+    )
@@ -0,0 +1,47 @@
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+
+from products.models import Product
+from products.signals import products_bulk_saved
+from .models import StockMovement
+
+
+def _writes_stock(update_fields):
+    return update_fields is None or 'stock' in update_fields
+
+
+@receiver(pre_save, sender=Product)
+def remember_stock(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Read the stored stock so the ledger gets the real change, not the form's"""
+    instance._stock_before = None
+    if raw or instance._state.adding or not _writes_stock(update_fields):
+        return
+    instance._stock_before = Product.objects.filter(pk=instance.pk).values_list('stock', flat=True).first()
+
+
+@receiver(post_save, sender=Product)
+def log_stock_edit(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Dashboard/admin stock edits go into the ledger as adjustments"""
+    if raw or not _writes_stock(update_fields):
+        return
+    before = 0 if created else getattr(instance, '_stock_before', None)
+    if before is None:
+        return
+    change = int(instance.stock) - before
+    if change:
+        StockMovement.objects.create(
+            product=instance, change=change, reason='opening' if created else 'adjustment'
+        )
+
+
+@receiver(products_bulk_saved)
+def log_bulk_stock_edits(sender, created, stock_changes, user=None, **kwargs):
+    """Bulk edits and imports write their stock changes to the ledger in one insert"""
+    created = set(created)
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            product_id=product_id, change=new - old, created_by=user,
+            reason='opening' if product_id in created else 'adjustment',
+        )
+        for product_id, (old, new) in stock_changes.items() if new != old
+    ])
@@ -0,0 +1,95 @@
+from django.db.models import Sum
+from django.test import TestCase
+
+from accounts.models import User
+from orders.models import Order
+from products.models import Category, Product
+from .models import StockMovement, StockReservation
+from .services import (
+    OutOfStockError, commit_reservations, release_reservations, reserve_stock, restock,
+)
+
+
+class StockServiceTests(TestCase):
+    """Reservations, commits, releases and the ledger they write"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'x', is_seller=True)
+        cls.customer = User.objects.create_user('customer', 'customer@example.com', 'x')
+        cls.category = Category.objects.create(name='Footwear')
+
+    def setUp(self):
+        self.product = Product.objects.create(
+            seller=self.seller, category=self.category, name='Canvas Shoes',
+            description='Shoes', price=100, stock=10,
+        )
+
+    def order(self):
+        return Order.objects.create(user=self.customer, total_amount=100, final_amount=100)
+
+    def levels(self):
+        self.product.refresh_from_db()
+        return self.product.stock, self.product.reserved_stock
+
+    def ledger_total(self):
+        return StockMovement.objects.filter(product=self.product).aggregate(total=Sum('change'))['total']
+
+    def test_reserve_holds_stock_without_taking_it(self):
+        order = self.order()
+        reserve_stock(order, {self.product.pk: 4})
+        self.assertEqual(self.levels(), (10, 4))
+        self.assertEqual(self.product.available_stock, 6)
+        reservation = StockReservation.objects.get(order=order)
+        self.assertEqual((reservation.quantity, reservation.status), (4, 'active'))
+
+    def test_reserve_more_than_available_fails(self):
+        reserve_stock(self.order(), {self.product.pk: 8})
+        with self.assertRaises(OutOfStockError):
+            reserve_stock(self.order(), {self.product.pk: 3})
+
+    def test_commit_turns_the_reservation_into_a_sale(self):
+        order = self.order()
+        reserve_stock(order, {self.product.pk: 4})
+        self.assertEqual(commit_reservations([order.pk]), {order.pk})
+        self.assertEqual(self.levels(), (6, 0))
+        sale = StockMovement.objects.get(order=order)
+        self.assertEqual((sale.reason, sale.change), ('sale', -4))
+        self.assertEqual(self.ledger_total(), 6)
+        self.assertEqual(StockReservation.objects.get(order=order).status, 'committed')
+
+    def test_commit_twice_is_a_no_op(self):
+        order = self.order()
+        reserve_stock(order, {self.product.pk: 4})
+        commit_reservations([order.pk])
+        self.assertEqual(commit_reservations([order.pk]), set())
+        self.assertEqual(self.levels(), (6, 0))
+        self.assertEqual(StockMovement.objects.filter(order=order).count(), 1)
+
+    def test_release_gives_the_stock_back(self):
+        order = self.order()
+        reserve_stock(order, {self.product.pk: 4})
+        self.assertEqual(release_reservations([order.pk]), {order.pk})
+        self.assertEqual(self.levels(), (10, 0))
+        self.assertFalse(StockMovement.objects.filter(order=order).exists())
+        self.assertEqual(StockReservation.objects.get(order=order).status, 'released')
+        self.assertEqual(commit_reservations([order.pk]), set())
+
+    def test_commit_after_stock_was_edited_below_the_reservation(self):
+        order = self.order()
+        reserve_stock(order, {self.product.pk: 4})
+        self.product.stock = 3
+        self.product.save()
+        with self.assertLogs('inventory', 'ERROR'):
+            commit_reservations([order.pk])
+        self.assertEqual(self.levels(), (0, 0))
+        self.assertEqual(StockMovement.objects.get(order=order).change, -3)
+        self.assertEqual(self.ledger_total(), 0)
+
+    def test_restock_adds_stock_and_logs_each_line(self):
+        order = self.order()
+        restock([(order.pk, self.product.pk, 2), (order.pk, self.product.pk, 1)], 'refund')
+        self.assertEqual(self.levels(), (13, 0))
+        movement = StockMovement.objects.get(order=order)
+        self.assertEqual((movement.reason, movement.change), ('refund', 3))
+        self.assertEqual(self.ledger_total(), 13)
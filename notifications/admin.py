@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import EmailLog
+from django.utils import timezone
+from .models import EmailLog, OutboxEmail
 
 
 @admin.register(EmailLog)
@@ -8,3 +9,17 @@ class EmailLogAdmin(admin.ModelAdmin):
     list_filter = ('is_sent', 'email_type', 'sent_at')
     search_fields = ('email', 'subject')
     readonly_fields = ('user', 'email', 'subject', 'message', 'email_type', 'is_sent', 'sent_at')
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'email', 'email_type', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status', 'email_type')
+    search_fields = ('email', 'subject')
+    readonly_fields = ('user', 'email', 'subject', 'message', 'email_type', 'attempts', 'last_error', 'created_at')
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        count = queryset.update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f'{count} emails queued again.')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from notifications.outbox import OUTBOX_BATCH_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send due emails from the outbox over one mail connection per batch (run every minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE, help='Emails per connection')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        sent, retried, failed = drain_outbox(options['batch_size'], options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Sent {sent} emails ({retried} to retry, {failed} failed)'))
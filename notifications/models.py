@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class EmailLog(models.Model):
@@ -20,3 +21,35 @@ class EmailLog(models.Model):
     
     def __str__(self):
         return f'{self.subject} to {self.email}'
+
+
+class OutboxEmail(models.Model):
+    """Email waiting to be sent by the send_queued_email worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    email_type = models.CharField(max_length=50, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # Due time; pushed forward while a worker holds the row and after failures
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} to {self.email} ({self.status})'
@@ -0,0 +1,135 @@
+"""
+Email outbox - IndiVibe E-Commerce
+
+Requests never talk to the mail server: queue_emails() inserts OutboxEmail
+rows (in the caller's transaction, so an email exists only if what it
+announces was committed) and the send_queued_email command delivers them.
+The worker claims a batch of due rows, opens one connection to the mail
+backend for the whole batch and sends the messages over it one by one, so
+one bad address doesn't fail its neighbours. Sent rows are deleted and
+logged with one EmailLog bulk_create per batch; failed rows are retried
+with exponential backoff until MAX_ATTEMPTS, then kept as 'failed'.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailLog, OutboxEmail
+
+OUTBOX_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = timedelta(minutes=1)  # doubled after every failed attempt
+MAX_BACKOFF = timedelta(hours=1)
+# How long a claimed row stays hidden from other workers; a worker that
+# dies mid-batch leaves its rows to be picked up again after this
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def queue_emails(emails):
+    """Insert unsaved OutboxEmail instances for the worker to send"""
+    emails = [email for email in emails if email.email]
+    return OutboxEmail.objects.bulk_create(emails)
+
+
+def retry_delay(attempts):
+    return min(RETRY_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def claim_batch(limit=OUTBOX_BATCH_SIZE):
+    """
+    Take up to limit due emails for this worker.
+
+    Locked rows are skipped, so several workers can drain the outbox at
+    once without sending anything twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:limit]
+        )
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                attempts=F('attempts') + 1, next_attempt_at=now + CLAIM_TIMEOUT,
+            )
+    for email in batch:
+        email.attempts += 1
+    return batch
+
+
+def _message(email, connection):
+    return EmailMessage(
+        subject=email.subject,
+        body=email.message,
+        from_email=settings.EMAIL_HOST_USER or None,
+        to=[email.email],
+        connection=connection,
+    )
+
+
+def send_batch(batch):
+    """Send claimed emails over one connection; returns (sent, retried, failed)"""
+    sent, errors = [], {}
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        errors = {email.pk: e for email in batch}
+    else:
+        try:
+            for email in batch:
+                try:
+                    connection.send_messages([_message(email, connection)])
+                except Exception as e:
+                    errors[email.pk] = e
+                else:
+                    sent.append(email)
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    retried, failed = [], []
+    for email in batch:
+        if email.pk not in errors:
+            continue
+        email.last_error = f'{type(errors[email.pk]).__name__}: {errors[email.pk]}'[:1000]
+        if email.attempts >= MAX_ATTEMPTS:
+            email.status = 'failed'
+            failed.append(email)
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+            retried.append(email)
+
+    with transaction.atomic():
+        if retried or failed:
+            OutboxEmail.objects.bulk_update(retried + failed, ['status', 'next_attempt_at', 'last_error'])
+        if sent:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in sent]).delete()
+        EmailLog.objects.bulk_create([
+            EmailLog(
+                user_id=email.user_id, email=email.email, subject=email.subject,
+                message=email.message, email_type=email.email_type, is_sent=email.pk not in errors,
+            )
+            for email in sent + failed
+        ])
+    return len(sent), len(retried), len(failed)
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE, max_batches=None):
+    """Send due emails batch by batch until none are left; returns totals"""
+    totals = [0, 0, 0]
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+        for index, count in enumerate(send_batch(batch)):
+            totals[index] += count
+        batches += 1
+    return tuple(totals)
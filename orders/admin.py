@@ -1,5 +1,6 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import Address, Order, OrderItem
+from .workflow import transition_orders
 
 
 class OrderItemInline(admin.TabularInline):
@@ -40,13 +41,19 @@ class OrderAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_shipped', 'mark_as_delivered']
     
+    def _transition(self, request, queryset, status):
+        moved, skipped = transition_orders(list(queryset.values_list('pk', flat=True)), status, user=request.user)
+        self.message_user(request, f'{len(moved)} orders marked as {status}.')
+        if skipped:
+            self.message_user(request, f'{len(skipped)} orders can\'t be {status} from their current status.', messages.WARNING)
+    
     @admin.action(description='Mark selected orders as shipped')
     def mark_as_shipped(self, request, queryset):
-        queryset.update(order_status='shipped')
+        self._transition(request, queryset, 'shipped')
     
     @admin.action(description='Mark selected orders as delivered')
     def mark_as_delivered(self, request, queryset):
-        queryset.update(order_status='delivered')
+        self._transition(request, queryset, 'delivered')
 
 
 @admin.register(OrderItem)
@@ -5,3 +5,6 @@ class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
     verbose_name = 'Orders'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from orders.services import expire_unpaid_orders
+
+
+class Command(BaseCommand):
+    help = 'Cancel unpaid orders whose stock reservation expired and release the stock (run every few minutes)'
+
+    def handle(self, *args, **kwargs):
+        expired = expire_unpaid_orders()
+        self.stdout.write(self.style.SUCCESS(f'✓ Cancelled {len(expired)} expired unpaid orders'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from orders.summary import rebuild_order_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-user order status totals from the orders table'
+
+    def handle(self, *args, **kwargs):
+        rows = rebuild_order_summaries()
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {rows} order status totals'))
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+def create_order_number_sequence(apps, schema_editor):
+    """Seed the counter row, and on PostgreSQL the block sequence"""
+    OrderNumberSequence = apps.get_model('orders', 'OrderNumberSequence')
+    OrderNumberSequence.objects.get_or_create(name='order_number')
+    if schema_editor.connection.vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            # INCREMENT BY is orders.numbering.BLOCK_SIZE
+            cursor.execute('CREATE SEQUENCE IF NOT EXISTS order_number_seq INCREMENT BY 100 START WITH 1')
+
+
+def drop_order_number_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('DROP SEQUENCE IF EXISTS order_number_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'Order Number Sequence',
+                'verbose_name_plural': 'Order Number Sequences',
+                'db_table': 'order_number_sequences',
+            },
+        ),
+        migrations.RunPython(create_order_number_sequence, drop_order_number_sequence),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-18 18:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_order_status_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderStatusTotal = apps.get_model('orders', 'OrderStatusTotal')
+    rows = (
+        Order.objects.order_by()
+        .values('user_id', 'order_status')
+        .annotate(order_count=Count('id'), amount=Sum('final_amount'))
+    )
+    OrderStatusTotal.objects.bulk_create([OrderStatusTotal(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_number_sequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('refunded', 'Refunded')], max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name': 'Order Status Total',
+                'verbose_name_plural': 'Order Status Totals',
+                'db_table': 'order_status_totals',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='orders_user_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='orderstatustotal',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_status_totals', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='orderstatustotal',
+            constraint=models.UniqueConstraint(fields=('user', 'order_status'), name='order_status_totals_user_status_uniq'),
+        ),
+        migrations.RunPython(backfill_order_status_totals, migrations.RunPython.noop),
+    ]
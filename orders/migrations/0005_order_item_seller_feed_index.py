@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_admin_order_list_indexes'),
+        ('products', '0009_product_reserved_stock'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'product'], name='order_items_order_product_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-18 19:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_seller_and_date(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Product = apps.get_model('products', 'Product')
+    OrderItem.objects.update(
+        seller_id=Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('seller_id')[:1]),
+        created_at=Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_item_seller_feed_index'),
+        ('products', '0011_product_unique_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='orderitem',
+            name='order_items_order_product_idx',
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='seller',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sold_items', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(copy_seller_and_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['seller', '-created_at', '-order'], name='order_items_seller_feed_idx'),
+        ),
+    ]
@@ -64,18 +64,58 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            # Order history pages walk this as a keyset
+            models.Index(fields=['user', '-created_at', '-id'], name='orders_user_created_idx'),
+            # Admin order list: unfiltered/date range, and per status filter
+            models.Index(fields=['-created_at', '-id'], name='orders_created_idx'),
+            models.Index(fields=['order_status', '-created_at', '-id'], name='orders_status_created_idx'),
+            models.Index(fields=['payment_status', '-created_at', '-id'], name='orders_payment_created_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.order_number:
-            import random
-            import string
-            self.order_number = 'IND' + ''.join(random.choices(string.digits, k=10))
+            from .numbering import next_order_number
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
     
     def __str__(self):
         return f'Order {self.order_number}'
 
 
+class OrderNumberSequence(models.Model):
+    """Counter that order numbers are allocated from (see orders.numbering)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        db_table = 'order_number_sequences'
+        verbose_name = 'Order Number Sequence'
+        verbose_name_plural = 'Order Number Sequences'
+
+    def __str__(self):
+        return f'{self.name}: {self.next_value}'
+
+
+class OrderStatusTotal(models.Model):
+    """Per-user order count and amount for one status (see orders.summary)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='order_status_totals')
+    order_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'order_status_totals'
+        verbose_name = 'Order Status Total'
+        verbose_name_plural = 'Order Status Totals'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'order_status'], name='order_status_totals_user_status_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.order_status}: {self.order_count}'
+
+
 class OrderItem(models.Model):
     """Individual items in an order"""
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
@@ -83,15 +123,33 @@ class OrderItem(models.Model):
     product_name = models.CharField(max_length=200)  # Store product name in case product is deleted
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Copied from the product and the order so the seller order feed can
+    # page through a seller's own lines on one index
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='sold_items', db_index=False,
+    )
+    created_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         db_table = 'order_items'
         verbose_name = 'Order Item'
         verbose_name_plural = 'Order Items'
+        indexes = [
+            # Seller order feed, newest first
+            models.Index(fields=['seller', '-created_at', '-order'], name='order_items_seller_feed_idx'),
+        ]
     
     def __str__(self):
         return f'{self.quantity} x {self.product_name}'
     
+    def save(self, *args, **kwargs):
+        if self.seller_id is None and self.product_id is not None:
+            self.seller_id = self.product.seller_id
+        if self.created_at is None:
+            self.created_at = self.order.created_at
+        super().save(*args, **kwargs)
+    
     @property
     def total_price(self):
         return self.price * self.quantity
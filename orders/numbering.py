@@ -0,0 +1,86 @@
+"""
+Order number allocation - IndiVibe E-Commerce
+
+Order numbers look like IND2610180000012345: the prefix, the order date
+(YYMMDD) and a zero-padded sequence value. The sequence is shared by
+every app node, so numbers never collide and there is nothing to retry,
+and new numbers land at the end of the unique index instead of at random
+places in it.
+
+On PostgreSQL each process reserves blocks of BLOCK_SIZE values from a
+database sequence (hi/lo) and hands them out from memory, so only one
+order in BLOCK_SIZE touches the database. Sequences ignore rollbacks, so
+a failed checkout can't give its block back to someone else; numbers
+from a block that is never used are simply skipped. Other databases
+increment a counter row inside the caller's transaction, one value at a
+time, because the increment must roll back with the order that used it.
+"""
+
+import os
+import threading
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OrderNumberSequence
+
+ORDER_NUMBER_PREFIX = 'IND'
+SEQUENCE_NAME = 'order_number'
+SEQUENCE_DIGITS = 10
+# Must match INCREMENT BY of the order_number_seq sequence (migration 0002)
+BLOCK_SIZE = 100
+
+
+def _reserve_from_sequence():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval('order_number_seq')")
+        return cursor.fetchone()[0], BLOCK_SIZE
+
+
+def _reserve_from_table():
+    with transaction.atomic():
+        counter = OrderNumberSequence.objects.filter(name=SEQUENCE_NAME)
+        if not counter.update(next_value=F('next_value') + 1):
+            OrderNumberSequence.objects.get_or_create(name=SEQUENCE_NAME)
+            counter.update(next_value=F('next_value') + 1)
+        return counter.values_list('next_value', flat=True).get() - 1, 1
+
+
+def reserve_block():
+    """(first value, size) of a range no other process will ever get"""
+    if connection.vendor == 'postgresql':
+        return _reserve_from_sequence()
+    return _reserve_from_table()
+
+
+class OrderNumberAllocator:
+    """Hands out sequence values from the current block, thread-safely"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = self._end = 0
+
+    def allocate(self):
+        with self._lock:
+            # A worker forked from a preloaded parent must not reuse its block
+            if self._next >= self._end or self._pid != os.getpid():
+                start, size = reserve_block()
+                self._pid = os.getpid()
+                self._next, self._end = start, start + size
+            value = self._next
+            self._next += 1
+            return value
+
+
+allocator = OrderNumberAllocator()
+
+
+def format_order_number(value, date=None):
+    date = date or timezone.localdate()
+    return f'{ORDER_NUMBER_PREFIX}{date:%y%m%d}{value:0{SEQUENCE_DIGITS}d}'
+
+
+def next_order_number():
+    return format_order_number(allocator.allocate())
@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from coupons.models import CouponUsage
+from inventory.services import (
+    OutOfStockError, commit_reservations, expired_reservation_order_ids,
+    release_reservations, reserve_stock,
+)
+from products.models import Product
+from .models import Order, OrderItem
+from .workflow import transition_orders
+
+
+def place_order(user, cart, address, coupon=None):
+    """
+    Turn a cart into an order atomically.
+
+    Returns (order, coupon_message); coupon_message is set when the coupon
+    was dropped because it no longer applies. Stock is only reserved here
+    and is committed when the order moves to confirmed (see workflow).
+    Raises OutOfStockError if any line is oversold, in which case
+    nothing is written.
+    """
+    with transaction.atomic():
+        cart_items = list(cart.items.values_list('product_id', 'quantity'))
+        quantities = dict(cart_items)
+
+        # No row locks: reserve_stock's conditional UPDATE is the real check
+        products = Product.objects.in_bulk(quantities)
+
+        short = [
+            (products[product_id].name, quantity, products[product_id].available_stock)
+            for product_id, quantity in cart_items
+            if product_id in products and products[product_id].available_stock < quantity
+        ]
+        if short:
+            raise OutOfStockError(short)
+
+        total_amount = sum(
+            (products[product_id].display_price * quantity
+             for product_id, quantity in cart_items if product_id in products),
+            Decimal('0')
+        )
+
+        discount_amount = Decimal('0')
+        coupon_message = None
+        if coupon:
+            is_valid, message = coupon.is_valid(user=user, order_amount=total_amount)
+            if is_valid:
+                discount_amount = Decimal(coupon.calculate_discount(total_amount))
+            else:
+                coupon_message = message
+                coupon = None
+
+        order = Order.objects.create(
+            user=user,
+            address=address,
+            total_amount=total_amount,
+            discount_amount=discount_amount,
+            final_amount=total_amount - discount_amount
+        )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=products[product_id],
+                product_name=products[product_id].name,
+                quantity=quantity,
+                price=products[product_id].display_price,
+                seller_id=products[product_id].seller_id,
+                created_at=order.created_at,
+            )
+            for product_id, quantity in cart_items if product_id in products
+        ])
+
+        reserve_stock(order, {pk: quantities[pk] for pk in products})
+
+        if coupon:
+            CouponUsage.objects.create(coupon=coupon, user=user)
+
+        cart.clear()
+
+    return order, coupon_message
+
+
+def expire_unpaid_orders(now=None):
+    """Cancel unpaid orders whose stock reservation ran out; returns them"""
+    orders = list(Order.objects.filter(pk__in=expired_reservation_order_ids(now)))
+    # Paid but never confirmed: the sale stands
+    commit_reservations([order.pk for order in orders if order.payment_status == 'paid'])
+    unpaid = [order.pk for order in orders if order.payment_status != 'paid']
+    cancelled, skipped = transition_orders(unpaid, 'cancelled')
+    # Not cancellable any more (e.g. already shipped), just free the stock
+    release_reservations([order.pk for order in skipped])
+    return cancelled
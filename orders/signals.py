@@ -0,0 +1,81 @@
+from collections import defaultdict
+
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Order
+from .summary import apply_order_delta
+
+SUMMARY_FIELDS = {'user_id', 'order_status', 'final_amount'}
+UNKNOWN = object()
+
+# Sent by workflow.transition_orders() after its bulk UPDATEs, inside the
+# transaction, with orders (the moved instances, already carrying their new
+# statuses) and previous ({pk: (order_status, payment_status)} before).
+orders_transitioned = Signal()
+
+
+@receiver(post_init, sender=Order)
+def remember_summary_fields(sender, instance, **kwargs):
+    """Keep what the summary last saw so saves can apply a delta"""
+    if not instance.pk:
+        instance._loaded_summary = None
+    elif SUMMARY_FIELDS & instance.get_deferred_fields():
+        # Don't load deferred fields one query per row just for this
+        instance._loaded_summary = UNKNOWN
+    else:
+        instance._loaded_summary = (instance.user_id, instance.order_status, instance.final_amount)
+
+
+@receiver(pre_save, sender=Order)
+def load_stored_summary_fields(sender, instance, raw=False, **kwargs):
+    """A deferred order's stored values are read once, before they change"""
+    if not raw and instance._loaded_summary is UNKNOWN:
+        instance._loaded_summary = (
+            Order.objects.filter(pk=instance.pk)
+            .values_list('user_id', 'order_status', 'final_amount')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Order)
+def update_order_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.user_id, instance.order_status, instance.final_amount)
+    previous = None if created else instance._loaded_summary
+    if previous != current:
+        if previous is not None:
+            apply_order_delta(previous[0], previous[1], -1, -previous[2])
+        apply_order_delta(*current[:2], 1, current[2])
+    instance._loaded_summary = current
+
+
+@receiver(pre_delete, sender=Order)
+def load_summary_fields(sender, instance, **kwargs):
+    """A deferred order can't be read after its row is gone, so load it now"""
+    if instance._loaded_summary is UNKNOWN:
+        instance.refresh_from_db(fields=instance.get_deferred_fields())
+        instance._loaded_summary = (instance.user_id, instance.order_status, instance.final_amount)
+
+
+@receiver(post_delete, sender=Order)
+def remove_from_order_summary(sender, instance, **kwargs):
+    user_id, order_status, amount = instance._loaded_summary or (
+        instance.user_id, instance.order_status, instance.final_amount
+    )
+    apply_order_delta(user_id, order_status, -1, -amount)
+
+
+@receiver(orders_transitioned, sender=Order)
+def update_summaries_after_transition(sender, orders, previous, **kwargs):
+    """The bulk UPDATE bypassed post_save; apply its deltas per user and status"""
+    deltas = defaultdict(lambda: [0, 0])
+    for order in orders:
+        old_status = previous[order.pk][0]
+        for key, sign in (((order.user_id, old_status), -1), ((order.user_id, order.order_status), 1)):
+            deltas[key][0] += sign
+            deltas[key][1] += sign * order.final_amount
+        order._loaded_summary = (order.user_id, order.order_status, order.final_amount)
+    for (user_id, order_status), (count, amount) in deltas.items():
+        apply_order_delta(user_id, order_status, count, amount)
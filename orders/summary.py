@@ -0,0 +1,80 @@
+"""
+Per-user order summary - IndiVibe E-Commerce
+
+OrderStatusTotal keeps one row per (user, order status) with the number
+of orders and their final amount. Signals apply deltas as orders are
+created, change status or are deleted, and bulk status changes apply
+the same deltas through orders_transitioned, so the summary on the order
+history page is a single small read. rebuild_order_summaries() recounts
+from the orders table for backfills.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import Order, OrderStatusTotal
+
+# Orders that count towards lifetime spend
+SPEND_STATUSES = ('confirmed', 'processing', 'shipped', 'delivered')
+
+
+def apply_order_delta(user_id, order_status, count_delta, amount_delta):
+    """Add count_delta orders worth amount_delta to a user's status total"""
+    if user_id is None or (not count_delta and not amount_delta):
+        return
+    totals = OrderStatusTotal.objects.filter(user_id=user_id, order_status=order_status)
+    changes = {
+        'order_count': F('order_count') + count_delta,
+        'amount': F('amount') + amount_delta,
+    }
+    # Only additions create rows; a removal with no row has nothing to undo
+    # (e.g. the user's totals were already deleted in the same cascade)
+    if not totals.update(**changes) and count_delta > 0:
+        OrderStatusTotal.objects.get_or_create(user_id=user_id, order_status=order_status)
+        totals.update(**changes)
+
+
+def rebuild_order_summaries(user_ids=None):
+    """Recompute status totals from the orders table; returns rows written"""
+    orders = Order.objects.all()
+    totals = OrderStatusTotal.objects.all()
+    if user_ids is not None:
+        orders = orders.filter(user_id__in=user_ids)
+        totals = totals.filter(user_id__in=user_ids)
+    rows = (
+        orders.order_by()
+        .values('user_id', 'order_status')
+        .annotate(order_count=Count('id'), amount=Sum('final_amount'))
+    )
+    with transaction.atomic():
+        totals.delete()
+        created = OrderStatusTotal.objects.bulk_create(
+            [OrderStatusTotal(**row) for row in rows], batch_size=1000
+        )
+    return len(created)
+
+
+def get_order_summary(user):
+    """Counts by status and lifetime spend for the order history page"""
+    labels = dict(Order.STATUS_CHOICES)
+    by_status = []
+    total_orders = 0
+    lifetime_spend = Decimal('0')
+    for total in OrderStatusTotal.objects.filter(user=user, order_count__gt=0):
+        by_status.append({
+            'status': total.order_status,
+            'label': labels.get(total.order_status, total.order_status),
+            'count': total.order_count,
+        })
+        total_orders += total.order_count
+        if total.order_status in SPEND_STATUSES:
+            lifetime_spend += total.amount
+    order = list(labels)
+    by_status.sort(key=lambda row: order.index(row['status']) if row['status'] in order else len(order))
+    return {
+        'total_orders': total_orders,
+        'lifetime_spend': lifetime_spend,
+        'by_status': by_status,
+    }
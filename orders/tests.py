@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from cart.models import Cart, CartItem
+from inventory.models import StockMovement, StockReservation
+from inventory.services import OutOfStockError
+from notifications.models import OutboxEmail
+from payments.models import Payment
+from products.models import Category, Product
+from .models import Address, Order
+from .services import expire_unpaid_orders, place_order
+from .workflow import InvalidTransition, transition_order, transition_orders
+
+
+class OrderTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'x', is_seller=True)
+        cls.customer = User.objects.create_user('customer', 'customer@example.com', 'x')
+        cls.category = Category.objects.create(name='Footwear')
+        cls.address = Address.objects.create(
+            user=cls.customer, name='Customer', phone='9999999999', address='1 Street',
+            city='Pune', state='MH', pincode='411001',
+        )
+
+    def setUp(self):
+        self.product = Product.objects.create(
+            seller=self.seller, category=self.category, name='Canvas Shoes',
+            description='Shoes', price=100, stock=10,
+        )
+
+    def place(self, quantity=1):
+        cart, created = Cart.objects.get_or_create(user=self.customer)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=quantity)
+        return place_order(self.customer, cart, self.address)[0]
+
+    def levels(self):
+        self.product.refresh_from_db()
+        return self.product.stock, self.product.reserved_stock
+
+
+class PlaceOrderTests(OrderTestCase):
+
+    def test_placing_an_order_reserves_its_stock(self):
+        order = self.place(3)
+        self.assertEqual(order.order_status, 'pending')
+        self.assertEqual(order.final_amount, 300)
+        self.assertEqual(self.levels(), (10, 3))
+        item = order.items.get()
+        self.assertEqual((item.seller_id, item.created_at), (self.seller.pk, order.created_at))
+        self.assertFalse(Cart.objects.get(user=self.customer).items.exists())
+
+    def test_oversold_cart_writes_nothing(self):
+        self.place(8)
+        with self.assertRaises(OutOfStockError):
+            self.place(3)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.levels(), (10, 8))
+
+
+class TransitionTests(OrderTestCase):
+
+    def test_confirming_commits_the_reservation_and_queues_an_email(self):
+        order = self.place(2)
+        transition_order(order, 'confirmed')
+        self.assertEqual(Order.objects.get(pk=order.pk).order_status, 'confirmed')
+        self.assertEqual(self.levels(), (8, 0))
+        self.assertEqual(StockMovement.objects.get(order=order).reason, 'sale')
+        self.assertTrue(OutboxEmail.objects.filter(email_type='order_confirmation').exists())
+
+    def test_disallowed_transition_raises_and_changes_nothing(self):
+        order = self.place()
+        with self.assertRaises(InvalidTransition):
+            transition_order(order, 'shipped')
+        self.assertEqual(Order.objects.get(pk=order.pk).order_status, 'pending')
+        self.assertEqual(self.levels(), (10, 1))
+
+    def test_bulk_transition_skips_orders_that_cant_move(self):
+        first, second = self.place(), self.place()
+        transition_order(second, 'cancelled')
+        moved, skipped = transition_orders([first.pk, second.pk], 'confirmed')
+        self.assertEqual([order.pk for order in moved], [first.pk])
+        self.assertEqual([order.pk for order in skipped], [second.pk])
+
+    def test_cancelling_a_pending_order_releases_its_stock(self):
+        order = self.place(2)
+        transition_order(order, 'cancelled')
+        self.assertEqual(self.levels(), (10, 0))
+        self.assertEqual(StockReservation.objects.get(order=order).status, 'released')
+        self.assertFalse(StockMovement.objects.filter(order=order).exists())
+
+    def test_cancelling_a_confirmed_order_restocks_it(self):
+        order = self.place(2)
+        transition_order(order, 'confirmed')
+        transition_order(order, 'cancelled')
+        self.assertEqual(self.levels(), (10, 0))
+        self.assertEqual(
+            sorted(StockMovement.objects.filter(order=order).values_list('reason', 'change')),
+            [('cancellation', 2), ('sale', -2)],
+        )
+
+    def test_refunding_a_cancelled_order_doesnt_restock_twice(self):
+        order = self.place(2)
+        transition_order(order, 'confirmed')
+        transition_order(order, 'cancelled')
+        transition_order(order, 'refunded')
+        self.assertEqual(self.levels(), (10, 0))
+        self.assertFalse(StockMovement.objects.filter(order=order, reason='refund').exists())
+
+    def test_refunding_a_delivered_order_restocks_and_refunds_the_payment(self):
+        order = self.place(2)
+        Payment.objects.create(order=order, amount=order.final_amount, payment_status='completed')
+        for status in ('confirmed', 'shipped', 'delivered', 'refunded'):
+            transition_order(order, status)
+        order.refresh_from_db()
+        self.assertEqual((order.order_status, order.payment_status), ('refunded', 'refunded'))
+        self.assertEqual(Payment.objects.get(order=order).payment_status, 'refunded')
+        self.assertEqual(self.levels(), (10, 0))
+
+    def test_delivering_a_cod_order_marks_it_paid(self):
+        order = self.place()
+        Payment.objects.create(order=order, amount=order.final_amount, payment_method='cod')
+        for status in ('confirmed', 'shipped', 'delivered'):
+            transition_order(order, status)
+        self.assertEqual(Order.objects.get(pk=order.pk).payment_status, 'paid')
+        self.assertEqual(Payment.objects.get(order=order).payment_status, 'completed')
+
+    def test_refunded_is_final(self):
+        order = self.place()
+        transition_order(order, 'cancelled')
+        transition_order(order, 'refunded')
+        for status in ('pending', 'confirmed', 'cancelled'):
+            with self.assertRaises(InvalidTransition):
+                transition_order(order, status)
+
+
+class ExpiryTests(OrderTestCase):
+
+    def test_unpaid_orders_are_cancelled_when_their_reservation_expires(self):
+        unpaid, paid = self.place(2), self.place(3)
+        Order.objects.filter(pk=paid.pk).update(payment_status='paid')
+        later = timezone.now() + timedelta(days=1)
+        cancelled = expire_unpaid_orders(now=later)
+        self.assertEqual([order.pk for order in cancelled], [unpaid.pk])
+        self.assertEqual(Order.objects.get(pk=unpaid.pk).order_status, 'cancelled')
+        self.assertEqual(self.levels(), (7, 0))
+
+    def test_reservations_that_havent_expired_are_kept(self):
+        order = self.place()
+        self.assertEqual(expire_unpaid_orders(), [])
+        self.assertEqual(Order.objects.get(pk=order.pk).order_status, 'pending')
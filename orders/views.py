@@ -1,11 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db.models import Prefetch
 from django.http import JsonResponse
 from cart.models import Cart
+from products.pagination import CursorPaginator, InvalidCursor
 from .models import Address, Order, OrderItem
 from .forms import AddressForm
-from coupons.models import Coupon, CouponUsage
+from .services import place_order, OutOfStockError
+from .workflow import transition_order, InvalidTransition
+from .summary import get_order_summary
+from coupons.models import Coupon
+
+ORDERS_PER_PAGE = 10
 
 
 @login_required
@@ -57,60 +64,22 @@ def checkout(request):
         
         address = get_object_or_404(Address, id=address_id, user=request.user)
         
-        # Create order with coupon discount if applied
-        total_amount = cart.subtotal
-        order_discount = 0
-        order_final_amount = total_amount
         used_coupon = None
-        
-        # Re-check coupon at order creation
         if applied_coupon:
-            try:
-                used_coupon = Coupon.objects.get(id=applied_coupon['coupon_id'])
-                is_valid, message = used_coupon.is_valid(user=request.user, order_amount=float(total_amount))
-                if is_valid:
-                    order_discount = float(used_coupon.calculate_discount(float(total_amount)))
-                    order_final_amount = float(total_amount) - order_discount
-                else:
-                    messages.warning(request, f'Coupon could not be applied: {message}')
-                    used_coupon = None
-            except Coupon.DoesNotExist:
-                used_coupon = None
+            used_coupon = Coupon.objects.filter(id=applied_coupon['coupon_id']).first()
         
-        order = Order.objects.create(
-            user=request.user,
-            address=address,
-            total_amount=total_amount,
-            discount_amount=order_discount,
-            final_amount=order_final_amount
-        )
-        
-        # Create order items
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                product_name=cart_item.product.name,
-                quantity=cart_item.quantity,
-                price=cart_item.product.display_price
-            )
-            
-            # Reduce stock
-            cart_item.product.stock -= cart_item.quantity
-            cart_item.product.save()
+        try:
+            order, coupon_message = place_order(request.user, cart, address, coupon=used_coupon)
+        except OutOfStockError as e:
+            messages.error(request, f'{e}. Please update your cart.')
+            return redirect('cart:cart')
         
-        # Create coupon usage record if coupon was used
-        if used_coupon:
-            CouponUsage.objects.create(
-                coupon=used_coupon,
-                user=request.user
-            )
-            # Clear coupon from session
-            if 'applied_coupon' in request.session:
-                del request.session['applied_coupon']
+        if coupon_message:
+            messages.warning(request, f'Coupon could not be applied: {coupon_message}')
         
-        # Clear cart
-        cart.clear()
+        # Clear coupon from session
+        if 'applied_coupon' in request.session:
+            del request.session['applied_coupon']
         
         return redirect('payments:initiate', order_id=order.id)
     
@@ -158,15 +127,30 @@ def add_address(request):
 
 @login_required
 def order_history(request):
-    """View order history"""
+    """View order history, newest first, one cursor page at a time"""
     orders = Order.objects.filter(user=request.user).prefetch_related('items')
-    return render(request, 'orders/order_history.html', {'orders': orders})
+    paginator = CursorPaginator(orders, ORDERS_PER_PAGE)
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page = paginator.page()
+    context = {
+        'orders': page,
+        'summary': get_order_summary(request.user),
+    }
+    return render(request, 'orders/order_history.html', context)
 
 
 @login_required
 def order_detail(request, order_id):
     """View order details"""
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+    order = get_object_or_404(
+        Order.objects.select_related('address', 'payment').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        ),
+        id=order_id,
+        user=request.user,
+    )
     return render(request, 'orders/order_detail.html', {'order': order})
 
 
@@ -183,16 +167,11 @@ def cancel_order(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user)
     
     if order.order_status in ['pending', 'confirmed']:
-        order.order_status = 'cancelled'
-        order.save()
-        
-        # Restore stock
-        for item in order.items.all():
-            if item.product:
-                item.product.stock += item.quantity
-                item.product.save()
-        
-        messages.success(request, f'Order {order.order_number} has been cancelled.')
+        try:
+            transition_order(order, 'cancelled', user=request.user)
+            messages.success(request, f'Order {order.order_number} has been cancelled.')
+        except InvalidTransition:
+            messages.error(request, 'This order cannot be cancelled.')
     else:
         messages.error(request, 'This order cannot be cancelled.')
     
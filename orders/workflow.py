@@ -0,0 +1,163 @@
+"""
+Order status workflow - IndiVibe E-Commerce
+
+TRANSITIONS lists where an order may go from each status. Every status
+change made by staff, payments or the expiry job goes through
+transition_orders(), which moves any number of orders in a fixed number
+of queries and applies the side effects of the new status:
+
+- stock: confirming or shipping commits the order's reservation,
+  cancelling/refunding releases it or restocks the lines
+- payment: refunds mark the payment refunded, delivering a COD order
+  marks it paid
+- hooks registered with @on_enter(status), e.g. queuing customer emails
+  in the outbox; they run inside the same transaction, so they commit or
+  roll back with the status change
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from inventory.services import commit_reservations, release_reservations, restock
+from notifications.outbox import queue_emails
+from notifications.utils import order_confirmation_email, order_shipped_email
+from payments.models import Payment
+from .models import Order, OrderItem
+from .signals import orders_transitioned
+
+TRANSITIONS = {
+    'pending': ('confirmed', 'cancelled'),
+    'confirmed': ('processing', 'shipped', 'cancelled', 'refunded'),
+    'processing': ('shipped', 'cancelled', 'refunded'),
+    'shipped': ('delivered', 'refunded'),
+    'delivered': ('refunded',),
+    'cancelled': ('refunded',),
+    'refunded': (),
+}
+
+# Statuses in which the order's stock has been sold
+FULFILMENT_STATUSES = ('confirmed', 'processing', 'shipped', 'delivered')
+CLOSED_STATUSES = ('cancelled', 'refunded')
+
+_hooks = defaultdict(list)
+
+
+class InvalidTransition(Exception):
+    """Raised when an order can't move to the requested status"""
+
+
+def allowed_transitions(status):
+    return TRANSITIONS.get(status, ())
+
+
+def can_transition(from_status, to_status):
+    return to_status in allowed_transitions(from_status)
+
+
+def on_enter(status):
+    """
+    Register fn(orders) to run, inside the transaction, after orders enter
+    `status`. Anything that leaves the database must be deferred with
+    transaction.on_commit().
+    """
+    def register(fn):
+        _hooks[status].append(fn)
+        return fn
+    return register
+
+
+def _run_hooks(status, orders):
+    for hook in _hooks[status]:
+        hook(orders)
+
+
+def _order_lines(order_ids):
+    return OrderItem.objects.filter(order_id__in=order_ids).values_list('order_id', 'product_id', 'quantity')
+
+
+def transition_orders(order_ids, to_status, user=None):
+    """
+    Move the given orders to to_status with set-based updates.
+
+    Returns (moved, skipped): the orders that changed, and those whose
+    current status doesn't allow the move (left untouched).
+    """
+    if to_status not in TRANSITIONS:
+        raise InvalidTransition(f'Unknown order status {to_status!r}')
+
+    with transaction.atomic():
+        locked = list(
+            Order.objects.select_for_update(of=('self',))
+            .select_related('user')
+            .filter(pk__in=order_ids)
+            .order_by('pk')
+        )
+        moved = [order for order in locked if can_transition(order.order_status, to_status)]
+        moved_ids = [order.pk for order in moved]
+        previous = {order.pk: (order.order_status, order.payment_status) for order in moved}
+        skipped = [order for order in locked if order not in moved]
+        if not moved:
+            return [], skipped
+
+        if to_status in FULFILMENT_STATUSES:
+            commit_reservations(moved_ids, user=user)
+        elif to_status in CLOSED_STATUSES:
+            released = release_reservations(moved_ids)
+            # Cancelled orders already got their stock back
+            restock_ids = [
+                order.pk for order in moved
+                if order.pk not in released and order.order_status != 'cancelled'
+            ]
+            reason = 'refund' if to_status == 'refunded' else 'cancellation'
+            restock(_order_lines(restock_ids), reason, user=user)
+
+        changes = {'order_status': to_status, 'updated_at': timezone.now()}
+        if to_status == 'refunded':
+            changes['payment_status'] = 'refunded'
+            Payment.objects.filter(order_id__in=moved_ids).update(payment_status='refunded')
+        Order.objects.filter(pk__in=moved_ids).update(**changes)
+
+        if to_status == 'delivered':
+            # Cash on delivery has now been collected
+            cod_ids = list(
+                Payment.objects.filter(order_id__in=moved_ids, payment_method='cod')
+                .values_list('order_id', flat=True)
+            )
+            Payment.objects.filter(order_id__in=cod_ids).update(payment_status='completed')
+            Order.objects.filter(pk__in=cod_ids).update(payment_status='paid')
+            for order in moved:
+                if order.pk in cod_ids:
+                    order.payment_status = 'paid'
+
+        for order in moved:
+            order.order_status = to_status
+            if to_status == 'refunded':
+                order.payment_status = 'refunded'
+        # The updates above bypass post_save; summaries and rollups listen for this
+        orders_transitioned.send(sender=Order, orders=moved, previous=previous)
+        _run_hooks(to_status, moved)
+
+    return moved, skipped
+
+
+def transition_order(order, to_status, user=None):
+    """Move a single order; raises InvalidTransition if it can't"""
+    moved, skipped = transition_orders([order.pk], to_status, user=user)
+    if not moved:
+        current = skipped[0].order_status if skipped else order.order_status
+        raise InvalidTransition(
+            f'Order {order.order_number} can\'t move from {current} to {to_status}.'
+        )
+    return moved[0]
+
+
+@on_enter('confirmed')
+def email_order_confirmation(orders):
+    queue_emails([order_confirmation_email(order) for order in orders])
+
+
+@on_enter('shipped')
+def email_order_shipped(orders):
+    queue_emails([order_shipped_email(order) for order in orders])
@@ -17,6 +17,8 @@ class Payment(models.Model):
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
+        # Captured for an order that was cancelled meanwhile; staff must refund it
+        ('refund_pending', 'Refund Pending'),
         ('refunded', 'Refunded'),
     ]
     
@@ -0,0 +1,101 @@
+import json
+from unittest import mock
+
+import razorpay
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from inventory.models import StockReservation
+from inventory.services import reserve_stock
+from orders.models import Order
+from orders.workflow import transition_order
+from products.models import Category, Product
+from .models import Payment
+
+
+class PaymentCallbackTests(TestCase):
+    """Razorpay callback: verified captures, late captures and forged posts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'x', is_seller=True)
+        cls.customer = User.objects.create_user('customer', 'customer@example.com', 'x')
+        cls.category = Category.objects.create(name='Footwear')
+
+    def setUp(self):
+        self.product = Product.objects.create(
+            seller=self.seller, category=self.category, name='Canvas Shoes',
+            description='Shoes', price=100, stock=10,
+        )
+        self.order = Order.objects.create(user=self.customer, total_amount=200, final_amount=200)
+        reserve_stock(self.order, {self.product.pk: 2})
+        self.payment = Payment.objects.create(
+            order=self.order, amount=self.order.final_amount, razorpay_order_id='order_test_1',
+        )
+
+    def callback(self, signature_ok=True):
+        body = {
+            'razorpay_order_id': 'order_test_1',
+            'razorpay_payment_id': 'pay_test_1',
+            'razorpay_signature': 'signature',
+        }
+        with mock.patch('razorpay.Client') as client:
+            if not signature_ok:
+                client.return_value.utility.verify_payment_signature.side_effect = (
+                    razorpay.errors.SignatureVerificationError('Razorpay Signature Verification Failed')
+                )
+            response = self.client.post(
+                reverse('payments:callback'), json.dumps(body), content_type='application/json'
+            )
+        self.order.refresh_from_db()
+        self.payment.refresh_from_db()
+        return response.json()
+
+    def test_verified_payment_confirms_the_order(self):
+        self.assertEqual(self.callback(), {'success': True, 'order_id': self.order.pk})
+        self.assertEqual((self.order.order_status, self.order.payment_status), ('confirmed', 'paid'))
+        self.assertEqual((self.payment.payment_status, self.payment.payment_id), ('completed', 'pay_test_1'))
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reserved_stock), (8, 0))
+
+    def test_payment_for_a_cancelled_order_is_kept_for_refund(self):
+        transition_order(self.order, 'cancelled')
+        with self.assertLogs('payments', 'ERROR'):
+            result = self.callback()
+        self.assertFalse(result['success'])
+        self.assertEqual(self.order.order_status, 'cancelled')
+        self.assertEqual(self.payment.payment_status, 'refund_pending')
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reserved_stock), (10, 0))
+
+    def test_payment_for_an_order_already_confirmed_is_accepted(self):
+        transition_order(self.order, 'confirmed')
+        self.assertTrue(self.callback()['success'])
+        self.assertEqual(self.order.order_status, 'confirmed')
+        self.assertEqual(self.payment.payment_status, 'completed')
+
+    def test_bad_signature_only_fails_the_attempt(self):
+        with self.assertLogs('payments', 'WARNING'):
+            result = self.callback(signature_ok=False)
+        self.assertEqual(result, {'success': False, 'error': 'Invalid signature'})
+        self.assertEqual(self.payment.payment_status, 'failed')
+        self.assertEqual((self.order.order_status, self.order.payment_status), ('pending', 'pending'))
+        self.assertEqual(StockReservation.objects.get(order=self.order).status, 'active')
+
+    def test_bad_signature_doesnt_touch_a_completed_payment(self):
+        self.callback()
+        with self.assertLogs('payments', 'WARNING'):
+            self.callback(signature_ok=False)
+        self.assertEqual(self.payment.payment_status, 'completed')
+        self.assertEqual((self.order.order_status, self.order.payment_status), ('confirmed', 'paid'))
+
+    def test_the_customer_can_pay_after_a_forged_callback(self):
+        with self.assertLogs('payments', 'WARNING'):
+            self.callback(signature_ok=False)
+        self.assertTrue(self.callback()['success'])
+        self.assertEqual(self.order.order_status, 'confirmed')
+
+    def test_get_is_rejected(self):
+        response = self.client.get(reverse('payments:callback'))
+        self.assertEqual(response.json(), {'success': False, 'error': 'Invalid request'})
@@ -4,9 +4,14 @@ from django.contrib import messages
 from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.db import transaction
 from orders.models import Order
+from orders.workflow import FULFILMENT_STATUSES, transition_order, InvalidTransition
 from .models import Payment
 import json
+import logging
+
+logger = logging.getLogger('payments')
 
 
 @login_required
@@ -18,6 +23,10 @@ def initiate_payment(request, order_id):
         messages.info(request, 'This order is already paid.')
         return redirect('orders:order_detail', order_id=order.id)
     
+    if order.order_status == 'cancelled':
+        messages.error(request, 'This order was cancelled because it was not paid in time.')
+        return redirect('orders:order_detail', order_id=order.id)
+    
     # Create or get payment record
     payment, created = Payment.objects.get_or_create(
         order=order,
@@ -38,6 +47,8 @@ def initiate_payment(request, order_id):
             })
             
             payment.razorpay_order_id = razorpay_order['id']
+            if payment.payment_status == 'failed':
+                payment.payment_status = 'pending'  # a new attempt
             payment.save()
             
             context = {
@@ -60,6 +71,36 @@ def initiate_payment(request, order_id):
     return render(request, 'payments/payment.html', context)
 
 
+def _capture_payment(payment):
+    """
+    Record a verified online payment and confirm its order.
+
+    The order is locked first so the reservation expiry job can't cancel
+    it halfway. If it was cancelled already (the payment took longer than
+    the reservation), its stock may have been sold to someone else: the
+    payment is kept as refund_pending for staff to refund, and False is
+    returned.
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(pk=payment.order_id)
+        order.payment_status = 'paid'
+        order.save(update_fields=['payment_status', 'updated_at'])
+        if order.order_status in ('pending',) + FULFILMENT_STATUSES:
+            payment.payment_status = 'completed'
+            payment.save()
+            if order.order_status == 'pending':
+                transition_order(order, 'confirmed')
+            return True
+
+        payment.payment_status = 'refund_pending'
+        payment.save()
+    logger.error(
+        'Payment %s captured for %s order %s; refund it',
+        payment.payment_id, order.order_status, order.order_number,
+    )
+    return False
+
+
 @csrf_exempt
 def payment_callback(request):
     """Handle Razorpay payment callback"""
@@ -85,21 +126,27 @@ def payment_callback(request):
             try:
                 client.utility.verify_payment_signature(params_dict)
                 
-                # Update payment
                 payment.payment_id = razorpay_payment_id
                 payment.razorpay_signature = razorpay_signature
-                payment.payment_status = 'completed'
-                payment.save()
-                
-                # Update order
-                payment.order.payment_status = 'paid'
-                payment.order.order_status = 'confirmed'
-                payment.order.save()
-                
-                return JsonResponse({'success': True, 'order_id': payment.order.id})
+                if not _capture_payment(payment):
+                    return JsonResponse({
+                        'success': False,
+                        'order_id': payment.order_id,
+                        'error': 'This order was cancelled before your payment arrived. '
+                                 'The amount will be refunded.',
+                    })
+                return JsonResponse({'success': True, 'order_id': payment.order_id})
             except razorpay.errors.SignatureVerificationError:
-                payment.payment_status = 'failed'
-                payment.save()
+                # Anyone can post here, so only an unfinished attempt is
+                # failed: the order stays payable and its stock reserved
+                # until expire_unpaid_orders releases it
+                if payment.payment_status in ('pending', 'processing'):
+                    payment.payment_status = 'failed'
+                    payment.save(update_fields=['payment_status', 'updated_at'])
+                logger.warning(
+                    'Rejected payment callback with a bad signature for order %s',
+                    payment.order_id,
+                )
                 return JsonResponse({'success': False, 'error': 'Invalid signature'})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
@@ -112,6 +159,10 @@ def cod_payment(request, order_id):
     """Process Cash on Delivery payment"""
     order = get_object_or_404(Order, id=order_id, user=request.user)
     
+    if order.order_status == 'cancelled':
+        messages.error(request, 'This order was cancelled because it was not paid in time.')
+        return redirect('orders:order_detail', order_id=order.id)
+    
     payment, created = Payment.objects.get_or_create(
         order=order,
         defaults={
@@ -125,8 +176,10 @@ def cod_payment(request, order_id):
         payment.payment_method = 'cod'
         payment.save()
     
-    order.order_status = 'confirmed'
-    order.save()
+    try:
+        transition_order(order, 'confirmed', user=request.user)
+    except InvalidTransition:
+        pass  # already confirmed
     
     messages.success(request, 'Order placed successfully! Pay on delivery.')
     return redirect('orders:order_confirmation', order_id=order.id)
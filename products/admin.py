@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, SubCategory, Product, ProductAttribute, ProductAttributeValue, ProductAttributeMapping, ProductImage
+from .models import Category, SubCategory, Product, ProductAttribute, ProductAttributeValue, ProductAttributeMapping, ProductImage, RelatedProduct
 
 
 class SubCategoryInline(admin.TabularInline):
@@ -77,3 +77,10 @@ class ProductAttributeValueAdmin(admin.ModelAdmin):
     list_display = ('attribute', 'value')
     list_filter = ('attribute',)
     search_fields = ('value', 'attribute__name')
+
+
+@admin.register(RelatedProduct)
+class RelatedProductAdmin(admin.ModelAdmin):
+    list_display = ('product', 'related', 'score', 'computed_at')
+    search_fields = ('product__name', 'related__name')
+    raw_id_fields = ('product', 'related')
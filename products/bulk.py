@@ -0,0 +1,318 @@
+"""
+Bulk catalog changes - IndiVibe E-Commerce
+
+The dashboard bulk editor and CSV import change many products at once.
+Rows are validated one at a time as they are read and applied in batches
+of BATCH_SIZE: one SELECT ... FOR UPDATE loads the batch's products, one
+bulk_update writes the edits and one bulk_create inserts new products.
+bulk_* skips per-object signals, so every batch sends products_bulk_saved
+once instead; search indexing, the stock ledger, the catalog cache and
+the growth rollups listen for it.
+
+CSV files use the product export's columns (id, name, description,
+category, price, discount_price, stock, is_active); other columns are
+ignored. Rows with an id update that product, rows without one create a
+product owned by the importing user. A blank cell leaves the value as
+it is, except discount_price, where blank means no discount. Renamed
+products get a new slug when the old one no longer fits the name, as
+they do when edited one at a time.
+"""
+
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Category, Product
+from .signals import products_bulk_saved
+from .slugs import SLUG_RETRIES, allocate_slugs, slug_base, slug_fits
+
+BATCH_SIZE = 500
+EDITABLE_FIELDS = ('price', 'discount_price', 'stock', 'is_active')
+IMPORT_FIELDS = ('name', 'description', 'category') + EDITABLE_FIELDS
+MAX_REPORTED_ERRORS = 200
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on', 'active'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'off', 'inactive'}
+
+
+class RowError(ValueError):
+    """A row that can't be applied; the message is shown to the user"""
+
+
+class BulkResult:
+    """Counts and per-row errors of one bulk edit or import"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.error_count = 0
+        self.errors = []  # (row, message), the first MAX_REPORTED_ERRORS
+
+    def error(self, row, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, str(message)))
+
+    @property
+    def more_errors(self):
+        return self.error_count - len(self.errors)
+
+
+def _decimal(value, label):
+    try:
+        number = Decimal(value.replace(',', ''))
+    except InvalidOperation:
+        raise RowError(f'{label} "{value}" is not a number')
+    if not number.is_finite() or number < 0:
+        raise RowError(f'{label} must be a positive amount')
+    return number.quantize(Decimal('0.01'))
+
+
+def _stock(value):
+    try:
+        stock = int(value)
+    except ValueError:
+        raise RowError(f'Stock "{value}" is not a whole number')
+    if stock < 0:
+        raise RowError('Stock can\'t be negative')
+    return stock
+
+
+def _flag(value):
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RowError(f'Active must be yes or no, not "{value}"')
+
+
+def clean_values(raw):
+    """
+    Parse the editable columns present in raw (a dict of strings).
+
+    Returns {field: value} for the cells that change something; blank
+    cells are skipped except discount_price, which blank clears.
+    """
+    values = {}
+    for field in EDITABLE_FIELDS:
+        if field not in raw or raw[field] is None:
+            continue
+        value = raw[field].strip()
+        if field == 'discount_price':
+            values[field] = _decimal(value, 'Discount price') if value else None
+        elif not value:
+            continue
+        elif field == 'price':
+            values[field] = _decimal(value, 'Price')
+        elif field == 'stock':
+            values[field] = _stock(value)
+        else:
+            values[field] = _flag(value)
+    return values
+
+
+def _check_prices(product):
+    if product.price is None or product.price <= 0:
+        raise RowError('Price must be more than zero')
+    if product.discount_price is not None and not 0 < product.discount_price < product.price:
+        raise RowError('Discount price must be below the price')
+
+
+def _create_with_slugs(products):
+    """bulk_create with free slugs, allocating again if a concurrent save took one"""
+    for attempt in range(SLUG_RETRIES):
+        allocate_slugs(products, Product.objects.all())
+        try:
+            with transaction.atomic():
+                return Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+        except IntegrityError:
+            if attempt == SLUG_RETRIES - 1:
+                raise
+
+
+def _update_with_slugs(products, fields, renamed):
+    """bulk_update, first giving renamed products free slugs (again if a concurrent save took one)"""
+    for attempt in range(SLUG_RETRIES):
+        allocate_slugs(renamed, Product.objects.exclude(pk__in=[product.pk for product in renamed]))
+        try:
+            with transaction.atomic():
+                return Product.objects.bulk_update(products, fields, batch_size=BATCH_SIZE)
+        except IntegrityError:
+            if attempt == SLUG_RETRIES - 1:
+                raise
+
+
+def apply_rows(products, rows, user, result):
+    """
+    Apply one batch of validated rows.
+
+    products scopes which products may be edited (e.g. the seller's own);
+    rows is a list of (row, product_id or None, values). New products are
+    created for the user. Rows that fail a cross-field check are reported
+    on result and left out; the rest are written together.
+    """
+    with transaction.atomic():
+        ids = [product_id for row, product_id, values in rows if product_id]
+        existing = products.select_for_update().in_bulk(ids) if ids else {}
+        now = timezone.now()
+
+        changed, fields, stock_changes, new, renamed = {}, set(), {}, [], {}
+        for row, product_id, values in rows:
+            if product_id is None:
+                product = Product(seller=user, **values)
+                try:
+                    if not product.name or product.category_id is None or product.price is None:
+                        raise RowError('New products need a name, category and price')
+                    _check_prices(product)
+                except RowError as e:
+                    result.error(row, e)
+                else:
+                    new.append(product)
+                continue
+
+            product = existing.get(product_id)
+            if product is None:
+                result.error(row, 'Unknown product id')
+                continue
+            before = {field: getattr(product, field) for field in values}
+            row_fields = {field for field, value in values.items() if before[field] != value}
+            for field in row_fields:
+                setattr(product, field, values[field])
+            try:
+                _check_prices(product)
+            except RowError as e:
+                for field in row_fields:
+                    setattr(product, field, before[field])
+                result.error(row, e)
+                continue
+
+            if not row_fields:
+                result.unchanged += 1
+                continue
+            product.updated_at = now
+            if 'name' in row_fields and not slug_fits(product.slug, slug_base(product)):
+                renamed[product.pk] = product
+                row_fields.add('slug')
+            changed[product.pk] = product
+            fields |= row_fields
+            if 'stock' in row_fields:
+                old_stock = stock_changes.get(product.pk, (before['stock'],))[0]
+                stock_changes[product.pk] = (old_stock, product.stock)
+
+        if changed:
+            _update_with_slugs(list(changed.values()), sorted(fields) + ['updated_at'], list(renamed.values()))
+        if new:
+            new = _create_with_slugs(new)
+            stock_changes.update({product.pk: (0, product.stock) for product in new if product.stock})
+
+        result.updated += len(changed)
+        result.created += len(new)
+        if changed or new:
+            products_bulk_saved.send(
+                sender=Product,
+                created=[product.pk for product in new],
+                updated=list(changed),
+                stock_changes=stock_changes,
+                user=user,
+            )
+
+
+def bulk_edit(products, edits, user):
+    """
+    Apply {product_id: raw column dict} from the bulk editor.
+
+    Returns a BulkResult; errors are keyed by product id.
+    """
+    result = BulkResult()
+    rows = []
+    for product_id, raw in edits.items():
+        try:
+            rows.append((product_id, product_id, clean_values(raw)))
+        except RowError as e:
+            result.error(product_id, e)
+    for start in range(0, len(rows), BATCH_SIZE):
+        apply_rows(products, rows[start:start + BATCH_SIZE], user, result)
+    return result
+
+
+def _category_lookup():
+    """Category id by lowercased name or slug (categories are few)"""
+    lookup = {}
+    for pk, name, slug in Category.objects.values_list('id', 'name', 'slug'):
+        lookup.setdefault(name.strip().lower(), pk)
+        lookup.setdefault(slug, pk)
+    return lookup
+
+
+def _text(raw, field):
+    """A text cell, undoing the apostrophe exports put before formula-like text"""
+    value = (raw.get(field) or '').strip()
+    if value[:1] == "'" and value[1:2] in ('=', '+', '-', '@'):
+        value = value[1:]
+    return value
+
+
+def _clean_import_row(raw, categories):
+    product_id = (raw.get('id') or '').strip()
+    if product_id and not product_id.isdigit():
+        raise RowError(f'Id "{product_id}" is not a product id')
+    values = clean_values(raw)
+    for field in ('name', 'description'):
+        value = _text(raw, field)
+        if value:
+            values[field] = value
+    if values.get('name') and len(values['name']) > 200:
+        raise RowError('Name is longer than 200 characters')
+    category = _text(raw, 'category')
+    if category:
+        try:
+            values['category_id'] = categories[category.lower()]
+        except KeyError:
+            raise RowError(f'Unknown category "{category}"')
+    return (int(product_id) if product_id else None), values
+
+
+def import_csv(products, file, user):
+    """
+    Stream an uploaded CSV of products and apply it in batches.
+
+    The file is read row by row and never held in memory as a whole.
+    Returns a BulkResult with per-row errors (row 1 is the header).
+    """
+    result = BulkResult()
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    try:
+        headers = {header.strip().lower() for header in reader.fieldnames or ()}
+    except (csv.Error, UnicodeDecodeError) as e:
+        result.error(1, f'Not a readable CSV file ({e})')
+        return result
+    if not headers & set(IMPORT_FIELDS):
+        result.error(1, 'No known columns; expected some of: id, ' + ', '.join(IMPORT_FIELDS))
+        return result
+
+    categories = _category_lookup()
+    batch = []
+    try:
+        for row, raw in enumerate(reader, start=2):
+            raw = {(key or '').strip().lower(): value for key, value in raw.items()}
+            try:
+                product_id, values = _clean_import_row(raw, categories)
+            except RowError as e:
+                result.error(row, e)
+                continue
+            batch.append((row, product_id, values))
+            if len(batch) >= BATCH_SIZE:
+                apply_rows(products, batch, user, result)
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        result.error(reader.line_num, f'Stopped reading the file: {e}')
+    if batch:
+        apply_rows(products, batch, user, result)
+    # Rows failing the cross-field checks are reported after their batch
+    result.errors.sort()
+    return result
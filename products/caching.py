@@ -0,0 +1,80 @@
+"""
+Catalog page caching - IndiVibe E-Commerce
+
+Anonymous GETs of catalog pages are cached whole, keyed on the full path
+and the catalog version. Any Product/Category/SubCategory write (admin,
+dashboard or shell, via signals) bumps the version so every cached page
+goes stale at once (see ecommerce_project.cache_versions). Values that
+aren't versioned, like stock or ratings, can lag by up to
+CATALOG_PAGE_TIMEOUT.
+"""
+
+import hashlib
+import re
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from ecommerce_project import cache_versions
+
+CATALOG_PAGE_TIMEOUT = 60 * 5
+
+CSRF_PLACEHOLDER = '__CSRF_TOKEN__'
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def catalog_version():
+    return cache_versions.get_version('catalog')
+
+
+def bump_catalog_version():
+    cache_versions.bump('catalog')
+
+
+def _page_key(request):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return cache_versions.versioned_key('catalog', 'page', digest)
+
+
+def _cacheable(request):
+    return (
+        request.method == 'GET'
+        and not request.user.is_authenticated
+        # A pending flash message would otherwise be baked into the page
+        and not len(get_messages(request))
+    )
+
+
+def cache_anonymous_page(view_func):
+    """Serve anonymous visitors from the page cache"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        cache = caches['catalog']
+        key = _page_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            # Every visitor needs their own CSRF token in the page's forms
+            content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Catalog-Cache'] = 'hit'
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        if response.status_code == 200 and not response.streaming:
+            content = response.content.decode(response.charset)
+            match = CSRF_INPUT_RE.search(content)
+            if match:
+                content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+            cache.set(key, (content, response['Content-Type']), CATALOG_PAGE_TIMEOUT)
+            response['X-Catalog-Cache'] = 'miss'
+        return response
+    return wrapper
@@ -0,0 +1,7 @@
+from django.utils.functional import SimpleLazyObject
+
+
+def catalog_version(request):
+    """Catalog cache version for {% cache %} fragment keys (looked up lazily)"""
+    from .caching import catalog_version as current_version
+    return {'catalog_version': SimpleLazyObject(current_version)}
@@ -0,0 +1,159 @@
+"""
+Attribute facets for product listings - IndiVibe E-Commerce
+
+Selected values arrive as ?f_<attribute_id>=<value_id> (repeatable).
+Values of the same attribute are OR-ed, different attributes are AND-ed.
+So that a shopper can add a second value of an attribute they already
+filter on, each selected attribute is counted over the products matching
+every *other* selection; the unselected attributes share one grouped
+query over the full result set. Each of these row sets is cached on its
+own, keyed by category and the selections it depends on. Selected values
+are always listed, with a count of 0 if nothing matches them any more,
+so they can be cleared.
+"""
+
+import hashlib
+
+from django.core.cache import caches
+from django.db.models import Count, Q
+
+from ecommerce_project import cache_versions
+from .models import ProductAttributeMapping, ProductAttributeValue
+
+FACET_PARAM_PREFIX = 'f_'
+FACET_CACHE_TIMEOUT = 60 * 10
+
+
+def selected_facets(request):
+    """{attribute_id: {value_id, ...}} from the query string"""
+    selected = {}
+    for key in request.GET:
+        if not key.startswith(FACET_PARAM_PREFIX):
+            continue
+        try:
+            attribute_id = int(key[len(FACET_PARAM_PREFIX):])
+            value_ids = {int(v) for v in request.GET.getlist(key) if v}
+        except ValueError:
+            continue
+        if value_ids:
+            selected[attribute_id] = value_ids
+    return selected
+
+
+def filter_by_facets(queryset, selected):
+    for value_ids in selected.values():
+        queryset = queryset.filter(
+            pk__in=ProductAttributeMapping.objects.filter(
+                attribute_value_id__in=value_ids
+            ).values('product_id')
+        )
+    return queryset
+
+
+def _selection_digest(selected):
+    selection = ';'.join(
+        f'{attribute_id}={",".join(map(str, sorted(values)))}'
+        for attribute_id, values in sorted(selected.items())
+    )
+    return hashlib.md5(selection.encode()).hexdigest()
+
+
+def _cache_key(category_slug, subcategory_slug, counted, selected):
+    # 'facets' depends on 'catalog', so any catalog write invalidates these
+    return cache_versions.versioned_key(
+        'facets', category_slug or '*', subcategory_slug or '*', counted, _selection_digest(selected)
+    )
+
+
+def facet_counts(queryset, attribute_ids=None, exclude_attribute_ids=()):
+    """
+    Rows of (attribute_id, attribute, value_id, value, count) in one query,
+    for the given attributes or all but the excluded ones.
+    """
+    mappings = ProductAttributeMapping.objects.filter(product__in=queryset.order_by().values('pk'))
+    if attribute_ids is not None:
+        mappings = mappings.filter(attribute_value__attribute_id__in=attribute_ids)
+    if exclude_attribute_ids:
+        mappings = mappings.exclude(attribute_value__attribute_id__in=exclude_attribute_ids)
+    return list(
+        mappings
+        .values_list(
+            'attribute_value__attribute_id',
+            'attribute_value__attribute__name',
+            'attribute_value_id',
+            'attribute_value__value',
+        )
+        .annotate(count=Count('product_id'))
+        .order_by('attribute_value__attribute__name', 'attribute_value__value')
+    )
+
+
+def build_facets(request, queryset, selected, category_slug=None, subcategory_slug=None, cacheable=True):
+    """
+    Facet groups for the sidebar, each value with its count, selection
+    state and a URL that toggles it.
+
+    queryset is the listing before the facet selections are applied.
+    """
+    cache = caches['catalog']
+    # (cache label, selections to filter by, attributes to count, attributes to skip)
+    parts = [('rest', selected, None, list(selected))]
+    for attribute_id in selected:
+        others = {other: values for other, values in selected.items() if other != attribute_id}
+        parts.append((str(attribute_id), others, [attribute_id], ()))
+
+    rows = []
+    for counted, selection, attribute_ids, exclude_attribute_ids in parts:
+        part_rows = None
+        if cacheable:
+            key = _cache_key(category_slug, subcategory_slug, counted, selection)
+            part_rows = cache.get(key)
+        if part_rows is None:
+            part_rows = facet_counts(filter_by_facets(queryset, selection), attribute_ids, exclude_attribute_ids)
+            if cacheable:
+                cache.set(key, part_rows, FACET_CACHE_TIMEOUT)
+        rows.extend(part_rows)
+    rows.extend(_unmatched_selections(selected, rows))
+    rows.sort(key=lambda row: (row[1], row[0], row[3]))
+
+    groups = []
+    for attribute_id, attribute_name, value_id, value, count in rows:
+        if not groups or groups[-1]['id'] != attribute_id:
+            groups.append({'id': attribute_id, 'name': attribute_name, 'values': []})
+        is_selected = value_id in selected.get(attribute_id, ())
+        groups[-1]['values'].append({
+            'id': value_id,
+            'value': value,
+            'count': count,
+            'selected': is_selected,
+            'url': _toggle_url(request, attribute_id, value_id, is_selected),
+        })
+    return groups
+
+
+def _unmatched_selections(selected, rows):
+    """Zero-count rows for selected values that no product matches"""
+    listed = {value_id for attribute_id, name, value_id, value, count in rows}
+    condition = Q()
+    for attribute_id, value_ids in selected.items():
+        if value_ids - listed:
+            condition |= Q(attribute_id=attribute_id, pk__in=value_ids - listed)
+    if not condition:
+        return []
+    return [
+        row + (0,) for row in
+        ProductAttributeValue.objects.filter(condition)
+        .values_list('attribute_id', 'attribute__name', 'id', 'value')
+    ]
+
+
+def _toggle_url(request, attribute_id, value_id, is_selected):
+    params = request.GET.copy()
+    for key in ('page', 'cursor'):
+        params.pop(key, None)
+    key = f'{FACET_PARAM_PREFIX}{attribute_id}'
+    values = [v for v in params.getlist(key) if v != str(value_id)]
+    if not is_selected:
+        values.append(str(value_id))
+    params.setlist(key, values)
+    return f'?{params.urlencode()}'
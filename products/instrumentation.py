@@ -0,0 +1,84 @@
+"""
+Listing instrumentation - IndiVibe E-Commerce
+
+Off unless the 'products.listing' logger is enabled for DEBUG, or a staff
+user adds ?trace=1 to a listing URL. Filters are only recorded, never
+executed early; result sizes come from what the page already fetched.
+"""
+
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from django.db import connection
+
+logger = logging.getLogger('products.listing')
+
+
+class ListingTrace:
+    """Collects filters, SQL timings and result sizes for one request"""
+
+    def __init__(self, request, view_name):
+        self.view_name = view_name
+        self.forced = request.GET.get('trace') == '1' and request.user.is_staff
+        self.enabled = self.forced or logger.isEnabledFor(logging.DEBUG)
+        self.filters = {}
+        self.page = None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.started = time.perf_counter()
+
+    def filter(self, name, value):
+        """Record that a filter or sort was applied"""
+        if self.enabled and value:
+            self.filters[name] = value
+
+    def result(self, page):
+        self.page = page
+
+    def _time_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += time.perf_counter() - start
+
+    @contextmanager
+    def capture(self):
+        with connection.execute_wrapper(self._time_query) if self.enabled else nullcontext():
+            yield
+
+    def finish(self, response):
+        if not self.enabled:
+            return response
+        total_ms = (time.perf_counter() - self.started) * 1000
+        db_ms = self.query_time * 1000
+        paginator = getattr(self.page, 'paginator', None)
+        record = {
+            'view': self.view_name,
+            'filters': self.filters,
+            'page_size': len(self.page) if self.page is not None else None,
+            # Only known when the numbered paginator already ran its COUNT
+            'total': paginator.count if paginator is not None else None,
+            'queries': self.query_count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        logger.log(logging.INFO if self.forced else logging.DEBUG, 'listing %s', record)
+        if self.forced:
+            response['Server-Timing'] = f'db;dur={db_ms:.2f}, total;dur={total_ms:.2f}'
+        return response
+
+
+def traced_listing(view_func):
+    """Attach a ListingTrace to request.listing_trace for the view's duration"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        trace = ListingTrace(request, view_func.__name__)
+        request.listing_trace = trace
+        with trace.capture():
+            response = view_func(request, *args, **kwargs)
+        return trace.finish(response)
+    return wrapper
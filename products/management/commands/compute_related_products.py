@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from products.caching import bump_catalog_version
+from products.models import RelatedProduct
+
+
+# (signal, weight, SQL returning (product_id, related_id, strength))
+SIGNALS = [
+    ('co-purchase', 3.0, """
+        SELECT a.product_id, b.product_id, COUNT(*)
+        FROM order_items a
+        JOIN order_items b ON b.order_id = a.order_id AND b.product_id <> a.product_id
+        WHERE a.product_id IS NOT NULL AND b.product_id IS NOT NULL
+        GROUP BY a.product_id, b.product_id
+    """),
+    ('co-wishlist', 2.0, """
+        SELECT a.product_id, b.product_id, COUNT(*)
+        FROM wishlist a
+        JOIN wishlist b ON b.user_id = a.user_id AND b.product_id <> a.product_id
+        GROUP BY a.product_id, b.product_id
+    """),
+    # Shared attribute values only count inside a category, otherwise common
+    # values like "Size: M" would pair up the whole catalog
+    ('attribute overlap', 1.0, """
+        SELECT a.product_id, b.product_id, COUNT(*)
+        FROM product_attribute_mappings a
+        JOIN product_attribute_mappings b
+            ON b.attribute_value_id = a.attribute_value_id AND b.product_id <> a.product_id
+        JOIN products pa ON pa.id = a.product_id
+        JOIN products pb ON pb.id = b.product_id AND pb.category_id = pa.category_id
+        GROUP BY a.product_id, b.product_id
+    """),
+]
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related_products table from orders, wishlists and attributes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=8, help='Related products kept per product')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        scores = defaultdict(lambda: defaultdict(float))
+
+        with connection.cursor() as cursor:
+            for name, weight, sql in SIGNALS:
+                cursor.execute(sql)
+                pairs = 0
+                for product_id, related_id, strength in cursor.fetchall():
+                    scores[product_id][related_id] += weight * strength
+                    pairs += 1
+                self.stdout.write(f'  - {name}: {pairs} pairs')
+
+        rows = []
+        for product_id, candidates in scores.items():
+            best = sorted(candidates.items(), key=lambda item: item[1], reverse=True)[:options['limit']]
+            rows.extend(
+                RelatedProduct(product_id=product_id, related_id=related_id, score=score)
+                for related_id, score in best
+            )
+
+        with transaction.atomic():
+            RelatedProduct.objects.all().delete()
+            RelatedProduct.objects.bulk_create(rows, batch_size=options['batch_size'])
+        bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Stored {len(rows)} related products for {len(scores)} products'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from products.models import Product
+from products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index'
+
+    def handle(self, *args, **kwargs):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt search index ({backend.__class__.__name__}) for {Product.objects.count()} products'
+        ))
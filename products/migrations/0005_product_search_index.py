@@ -0,0 +1,53 @@
+# Full-text search index for products (PostgreSQL tsvector / SQLite FTS5)
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    """Create the vendor specific search structures and fill them"""
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS products_search_vector_idx '
+                'ON products USING GIN (search_vector)'
+            )
+        elif vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+                    "name, category, description, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+            except OperationalError:
+                # SQLite built without FTS5, search falls back to LIKE queries
+                return
+        else:
+            return
+
+    from products.search import PostgresSearchBackend, SqliteSearchBackend
+    backend_class = PostgresSearchBackend if vendor == 'postgresql' else SqliteSearchBackend
+    backend_class(schema_editor.connection).rebuild()
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS products_search_vector_idx')
+            cursor.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
+        elif vendor == 'sqlite':
+            cursor.execute('DROP TABLE IF EXISTS products_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_add_footwear_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
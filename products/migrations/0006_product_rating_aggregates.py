@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 18:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('reviews', 'Review')
+    per_product = Review.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    Product.objects.update(
+        rating_count=Coalesce(
+            Subquery(per_product.annotate(c=Count('id')).values('c'), output_field=IntegerField()), 0
+        ),
+        rating_sum=Coalesce(
+            Subquery(per_product.annotate(s=Sum('rating')).values('s'), output_field=IntegerField()), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_search_index'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
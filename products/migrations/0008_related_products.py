@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 18:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='products.product')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Related Product',
+                'verbose_name_plural': 'Related Products',
+                'db_table': 'related_products',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['product', '-score'], name='related_products_score_idx')],
+                'unique_together': {('product', 'related')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_related_products'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved_stock',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 19:00
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils.text import slugify
+
+
+def dedupe_product_slugs(apps, schema_editor):
+    """The oldest product keeps a shared slug; the others (and blank ones) get a free suffix"""
+    Product = apps.get_model('products', 'Product')
+    shared = list(
+        Product.objects.values('slug').annotate(n=Count('id')).filter(n__gt=1).values_list('slug', flat=True)
+    )
+    taken = set(Product.objects.values_list('slug', flat=True))
+    seen = set()
+    for product in Product.objects.filter(models.Q(slug__in=shared) | models.Q(slug='')).order_by('id'):
+        if product.slug and product.slug not in seen:
+            seen.add(product.slug)
+            continue
+        base = product.slug or slugify(product.name)[:190] or 'product'
+        slug, counter = base, 1
+        while slug in taken:
+            slug = f'{base}-{counter}'
+            counter += 1
+        taken.add(slug)
+        Product.objects.filter(pk=product.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_reserved_stock'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_product_slugs, migrations.RunPython.noop),
+    ]
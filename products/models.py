@@ -1,6 +1,14 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce, NullIf
 from django.conf import settings
-from django.utils.text import slugify
+
+from .slugs import save_with_slug
+
+
+def display_price_expression(prefix=''):
+    """SQL equivalent of Product.display_price, e.g. prefix='product__'"""
+    return F(f'{prefix}effective_price')
 
 
 class Category(models.Model):
@@ -18,9 +26,7 @@ class Category(models.Model):
         ordering = ['name']
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        save_with_slug(self, super().save, *args, **kwargs)
     
     def __str__(self):
         return self.name
@@ -43,9 +49,7 @@ class SubCategory(models.Model):
         unique_together = ['category', 'slug']
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        save_with_slug(self, super().save, *args, scope=('category_id',), **kwargs)
     
     def __str__(self):
         return f'{self.category.name} > {self.name}'
@@ -86,14 +90,25 @@ class Product(models.Model):
     subcategory = models.ForeignKey(SubCategory, on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='products')
     name = models.CharField(max_length=200)
-    slug = models.SlugField(max_length=200, blank=True)
+    slug = models.SlugField(max_length=200, unique=True, blank=True)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
-    stock = models.PositiveIntegerField(default=0)
+    # What the customer pays; computed by the database on every write
+    effective_price = models.GeneratedField(
+        expression=Coalesce(NullIf(F('discount_price'), 0), F('price')),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+    stock = models.PositiveIntegerField(default=0)  # on hand; changes are logged in inventory
+    # Held by unpaid orders, maintained by inventory.services
+    reserved_stock = models.PositiveIntegerField(default=0)
     image = models.ImageField(upload_to='products/', blank=True, null=True)
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
+    # Denormalized from reviews, maintained by reviews.signals
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -102,11 +117,38 @@ class Product(models.Model):
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'category', 'effective_price'], name='products_active_cat_price_idx'),
+            models.Index(fields=['is_active', 'created_at'], name='products_active_created_idx'),
+        ]
+    
+    # Only ever changed with F() updates; a full save() of an instance loaded
+    # earlier must not write back stale values
+    COUNTER_FIELDS = ('reserved_stock', 'rating_count', 'rating_sum')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Checkout and order status changes move stock with F() updates
+        # meanwhile; save() only writes it back if it was edited
+        instance._loaded_stock = instance.__dict__.get('stock')
+        return instance
+    
+    def _stock_edited(self):
+        if 'stock' in self.get_deferred_fields():
+            return False
+        loaded = getattr(self, '_loaded_stock', None)
+        return loaded is None or self._meta.get_field('stock').to_python(self.stock) != loaded
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated and field.name not in self.COUNTER_FIELDS
+                and (field.name != 'stock' or self._stock_edited())
+            ]
+        save_with_slug(self, super().save, *args, **kwargs)
+        self._loaded_stock = self._meta.get_field('stock').to_python(self.stock)
     
     def __str__(self):
         return self.name
@@ -123,16 +165,20 @@ class Product(models.Model):
             return int(((self.price - self.discount_price) / self.price) * 100)
         return 0
     
+    @property
+    def available_stock(self):
+        """Units that can still be sold: on hand minus held for unpaid orders"""
+        return max(self.stock - self.reserved_stock, 0)
+    
     @property
     def in_stock(self):
-        return self.stock > 0
+        return self.available_stock > 0
     
     @property
     def average_rating(self):
-        """Calculate average rating from reviews"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return sum(r.rating for r in reviews) / reviews.count()
+        """Average rating from the stored review aggregates"""
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return 0
 
 
@@ -163,3 +209,24 @@ class ProductImage(models.Model):
     
     def __str__(self):
         return f'Image for {self.product.name}'
+
+
+class RelatedProduct(models.Model):
+    """Precomputed recommendations, filled by compute_related_products"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'related_products'
+        verbose_name = 'Related Product'
+        verbose_name_plural = 'Related Products'
+        unique_together = ['product', 'related']
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['product', '-score'], name='related_products_score_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.product.name} -> {self.related.name} ({self.score})'
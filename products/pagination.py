@@ -0,0 +1,193 @@
+"""
+Listing pagination - IndiVibe E-Commerce
+
+Shallow pages use Django's numbered Paginator. Past MAX_NUMBERED_PAGES the
+listing switches to keyset (cursor) pagination: the cursor carries the sort
+values of the last row seen, so every page is a range read on the sort
+index instead of COUNT(*) + OFFSET.
+"""
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+MAX_NUMBERED_PAGES = 10
+CURSOR_SALT = 'products.pagination'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def ordering_keys(queryset):
+    """
+    The (field, descending) keys a queryset is ordered by, with pk as the
+    final tie-breaker, or None if the ordering can't be used as a keyset
+    (e.g. ordering by expressions).
+    """
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    keys = []
+    for item in ordering:
+        if not isinstance(item, str) or item == '?' or '__' in item:
+            return None
+        descending = item.startswith('-')
+        name = item.lstrip('-')
+        if name == 'pk':
+            name = queryset.model._meta.pk.name
+        keys.append((name, descending))
+    pk_name = queryset.model._meta.pk.name
+    if not any(name == pk_name for name, descending in keys):
+        keys.append((pk_name, keys[-1][1] if keys else False))
+    return keys
+
+
+class CursorPage:
+    """A page of results plus opaque cursors to its neighbours"""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset paginator over a queryset's own ordering (instances or values() rows)"""
+
+    def __init__(self, queryset, per_page, keys=None):
+        self.keys = keys or ordering_keys(queryset)
+        self.per_page = per_page
+        self.queryset = queryset.order_by(*self._order_by(reverse=False))
+
+    def _order_by(self, reverse):
+        return [
+            name if descending == reverse else f'-{name}'
+            for name, descending in self.keys
+        ]
+
+    def encode(self, obj, direction):
+        if isinstance(obj, dict):
+            values = [self._serialize(obj[name]) for name, descending in self.keys]
+        else:
+            values = [self._serialize(getattr(obj, name)) for name, descending in self.keys]
+        return signing.dumps([direction, values], salt=CURSOR_SALT, compress=True)
+
+    def decode(self, token):
+        try:
+            direction, values = signing.loads(token, salt=CURSOR_SALT)
+        except signing.BadSignature as e:
+            raise InvalidCursor(str(e))
+        if direction not in ('next', 'prev') or len(values) != len(self.keys):
+            raise InvalidCursor('Cursor does not match this listing')
+        return direction, [self._deserialize(name, value) for (name, descending), value in zip(self.keys, values)]
+
+    def _serialize(self, value):
+        if value is None or isinstance(value, (int, float, str, bool)):
+            return value
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def _deserialize(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value  # annotation, e.g. search_rank
+        return field.to_python(value)
+
+    def _after(self, values, reverse):
+        """Rows strictly after `values` in the (possibly reversed) ordering"""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.keys):
+            lookup = 'lt' if descending != reverse else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[i]})
+            for (prev_name, prev_descending), prev_value in zip(self.keys[:i], values[:i]):
+                clause &= Q(**{prev_name: prev_value})
+            condition |= clause
+        return condition
+
+    def page(self, cursor=None):
+        direction, values = self.decode(cursor) if cursor else ('next', None)
+        reverse = direction == 'prev'
+
+        queryset = self.queryset
+        if reverse:
+            queryset = queryset.order_by(*self._order_by(reverse=True))
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return CursorPage([], None, None)
+
+        if reverse:
+            next_cursor = self.encode(rows[-1], 'next')
+            previous_cursor = self.encode(rows[0], 'prev') if has_more else None
+        else:
+            next_cursor = self.encode(rows[-1], 'next') if has_more else None
+            previous_cursor = self.encode(rows[0], 'prev') if values is not None else None
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+
+def paginate(request, queryset, per_page=12):
+    """
+    Page a product listing.
+
+    ?page=N is served by the numbered paginator up to MAX_NUMBERED_PAGES;
+    ?cursor=... (linked from the last numbered page onwards) is served by
+    the keyset paginator. Listings whose ordering can't be used as a
+    keyset always use numbered pages.
+    """
+    keys = ordering_keys(queryset)
+    cursor = request.GET.get('cursor')
+
+    if keys:
+        cursor_paginator = CursorPaginator(queryset, per_page, keys)
+        # Same total order in both modes, so ties can't repeat across pages
+        queryset = cursor_paginator.queryset
+        if cursor:
+            try:
+                return cursor_paginator.page(cursor)
+            except InvalidCursor:
+                pass
+
+    number = request.GET.get('page')
+    if keys and number:
+        # Deep OFFSET pages are only reachable through cursors
+        try:
+            number = min(int(number), MAX_NUMBERED_PAGES)
+        except ValueError:
+            number = 1
+    paginator = Paginator(queryset, per_page)
+    page = paginator.get_page(number)
+    page.is_cursor = False
+    page.next_cursor = None
+    if keys and page.number >= MAX_NUMBERED_PAGES and page.has_next():
+        # Continue past the numbered range with a cursor from the last row
+        page.next_cursor = cursor_paginator.encode(page.object_list[len(page) - 1], 'next')
+    return page
@@ -0,0 +1,214 @@
+"""
+Product search backends - IndiVibe E-Commerce
+
+The index holds three weighted fields per product: the product name, its
+category/subcategory names and the description. Which backend is used is
+picked from the database vendor, or forced with the PRODUCT_SEARCH_BACKEND
+setting (a dotted path to a backend class).
+"""
+
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Hard cap on query terms so a pasted paragraph can't build a huge query
+MAX_TERMS = 8
+
+
+def tokenize(query):
+    """Split a user query into lowercase search terms"""
+    return [term.lower() for term in TOKEN_RE.findall(query or '')][:MAX_TERMS]
+
+
+class BaseSearchBackend:
+    """Common interface for product search backends"""
+
+    def __init__(self, db_connection=None, using=DEFAULT_DB_ALIAS):
+        # Migrations pass schema_editor.connection; cached backends look
+        # their connection up from the alias, per thread
+        self._connection = db_connection
+        self.using = using
+
+    @property
+    def connection(self):
+        return self._connection or connections[self.using]
+
+    def search(self, queryset, query):
+        """Filter a Product queryset by query, ordered by relevance"""
+        raise NotImplementedError
+
+    def index_products(self, product_ids):
+        """(Re)index the given product ids"""
+
+    def remove_products(self, product_ids):
+        """Drop the given product ids from the index"""
+
+    def rebuild(self):
+        """Rebuild the whole index from the products table"""
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """Unindexed LIKE search, used when no full-text engine is available"""
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) |
+                Q(description__icontains=term) |
+                Q(category__name__icontains=term) |
+                Q(subcategory__name__icontains=term)
+            )
+        return queryset
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector column on products with a GIN index"""
+
+    DOCUMENT_SQL = """
+        setweight(to_tsvector('simple', coalesce(products.name, '')), 'A') ||
+        setweight(to_tsvector('simple',
+            coalesce((SELECT name FROM categories WHERE categories.id = products.category_id), '') || ' ' ||
+            coalesce((SELECT name FROM subcategories WHERE subcategories.id = products.subcategory_id), '')
+        ), 'B') ||
+        setweight(to_tsvector('simple', coalesce(products.description, '')), 'C')
+    """
+
+    def _tsquery(self, terms):
+        # Every term must match; the last one may be partially typed
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        tsquery = self._tsquery(terms)
+        return queryset.filter(
+            pk__in=RawSQL("SELECT id FROM products WHERE search_vector @@ to_tsquery('simple', %s)", [tsquery])
+        ).annotate(
+            search_rank=RawSQL("ts_rank(products.search_vector, to_tsquery('simple', %s))", [tsquery])
+        ).order_by('-search_rank', '-created_at')
+
+    def index_products(self, product_ids):
+        if not product_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE products SET search_vector = {self.DOCUMENT_SQL} WHERE products.id = ANY(%s)',
+                [list(product_ids)]
+            )
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'UPDATE products SET search_vector = {self.DOCUMENT_SQL}')
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    """FTS5 virtual table keyed by product id (rowid)"""
+
+    TABLE = 'products_fts'
+
+    INSERT_SQL = """
+        INSERT INTO products_fts (rowid, name, category, description)
+        SELECT products.id, products.name,
+               coalesce(categories.name, '') || ' ' || coalesce(subcategories.name, ''),
+               products.description
+        FROM products
+        LEFT JOIN categories ON categories.id = products.category_id
+        LEFT JOIN subcategories ON subcategories.id = products.subcategory_id
+    """
+
+    def _match(self, terms):
+        # Quote each term so FTS5 operators typed by users are taken literally
+        return ' '.join('"{}"*'.format(term.replace('"', '')) for term in terms)
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        match = self._match(terms)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower for better matches; name and category count more than description
+            search_rank=RawSQL(
+                f'SELECT -bm25({self.TABLE}, 10.0, 5.0, 1.0) FROM {self.TABLE} '
+                f'WHERE {self.TABLE} MATCH %s AND {self.TABLE}.rowid = products.id',
+                [match]
+            )
+        ).order_by('-search_rank', '-created_at')
+
+    def index_products(self, product_ids):
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE} WHERE rowid IN ({placeholders})', product_ids)
+            cursor.execute(f'{self.INSERT_SQL} WHERE products.id IN ({placeholders})', product_ids)
+
+    def remove_products(self, product_ids):
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE} WHERE rowid IN ({placeholders})', product_ids)
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE}')
+            cursor.execute(self.INSERT_SQL)
+
+
+def sqlite_has_fts_table(db_connection=None):
+    """Check whether the FTS5 table was created by the migration"""
+    with (db_connection or connection).cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SqliteSearchBackend.TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+_backends = {}  # {connection alias: backend}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    """
+    Return the search backend for a database (cached per connection alias).
+
+    The choice is made once per alias, including the LIKE fallback used
+    while SQLite has no FTS5 table, so searches don't look the table up
+    every time. Running migrate clears the cache (see
+    products.signals), and other processes pick up the FTS table when
+    they restart after the deploy.
+    """
+    backend = _backends.get(using)
+    if backend is None:
+        db_connection = connections[using]
+        backend_path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+        if backend_path:
+            backend = import_string(backend_path)(using=using)
+        elif db_connection.vendor == 'postgresql':
+            backend = PostgresSearchBackend(using=using)
+        elif db_connection.vendor == 'sqlite' and sqlite_has_fts_table(db_connection):
+            backend = SqliteSearchBackend(using=using)
+        else:
+            backend = BasicSearchBackend(using=using)
+        _backends[using] = backend
+    return backend
+
+
+def clear_search_backends():
+    """Forget the cached backends, e.g. after migrations changed the tables"""
+    _backends.clear()
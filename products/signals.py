@@ -0,0 +1,83 @@
+from django.db.models.signals import post_init, post_save, post_delete, post_migrate
+from django.dispatch import Signal, receiver
+
+from .models import Product, Category, SubCategory, ProductAttributeMapping
+from .search import clear_search_backends, get_search_backend
+from .caching import bump_catalog_version
+
+# What the search document is built from
+SEARCH_FIELDS = ('name', 'description', 'category_id', 'subcategory_id')
+UNKNOWN = object()
+
+# Sent by products.bulk after each batch of bulk_update/bulk_create, which
+# skip the per-object signals. kwargs: created and updated (product ids),
+# stock_changes ({product_id: (old_stock, new_stock)}) and user.
+products_bulk_saved = Signal()
+
+
+def _search_fields(instance):
+    deferred = instance.get_deferred_fields()
+    if any(field in deferred for field in SEARCH_FIELDS):
+        return UNKNOWN
+    return tuple(getattr(instance, field) for field in SEARCH_FIELDS)
+
+
+@receiver(post_init, sender=Product)
+def remember_search_fields(sender, instance, **kwargs):
+    """Keep what the index last saw so other saves can skip re-indexing"""
+    instance._loaded_search_fields = _search_fields(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Re-index products whose name, description or categories changed"""
+    if raw:
+        return
+    current = _search_fields(instance)
+    touched = update_fields is None or any(
+        field in update_fields or field.removesuffix('_id') in update_fields for field in SEARCH_FIELDS
+    )
+    if created or (touched and (current is UNKNOWN or current != instance._loaded_search_fields)):
+        get_search_backend().index_products([instance.pk])
+    instance._loaded_search_fields = current
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    get_search_backend().remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+def reindex_category_products(sender, instance, created=False, raw=False, **kwargs):
+    """Category names are part of the product document"""
+    if raw or created:
+        return
+    product_ids = list(instance.products.values_list('id', flat=True))
+    get_search_backend().index_products(product_ids)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_save, sender=ProductAttributeMapping)
+@receiver(post_delete, sender=ProductAttributeMapping)
+def catalog_changed(sender, **kwargs):
+    """Cached catalog pages, product cards and facet counts go stale together"""
+    bump_catalog_version()
+
+
+@receiver(post_migrate)
+def forget_search_backends(sender, **kwargs):
+    """A migration may have created (or dropped) the FTS table"""
+    clear_search_backends()
+
+
+@receiver(products_bulk_saved)
+def bulk_products_saved(sender, created, updated, **kwargs):
+    """Index and invalidate once per batch instead of once per product"""
+    get_search_backend().index_products(list(created) + list(updated))
+    bump_catalog_version()
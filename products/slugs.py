@@ -0,0 +1,95 @@
+"""
+Unique slugs - IndiVibe E-Commerce
+
+Products, categories and subcategories get their slug from their name,
+with a numeric suffix when it's taken: "canvas-shoes", "canvas-shoes-1",
+"canvas-shoes-2", ... next_free_slug() finds the highest suffix in use
+with one indexed query instead of probing suffixes one at a time. Two
+saves can still pick the same slug concurrently; the unique constraint
+rejects the second one and save_with_slug() allocates again.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+SLUG_RETRIES = 5
+# Room kept at the end of the field for "-<counter>"
+SUFFIX_LENGTH = 10
+# Longer numeric suffixes (typed in by hand) are treated as part of the
+# name, so casting the highest one always fits a bigint
+MAX_SUFFIX_DIGITS = 18
+
+
+def slug_base(instance, source='name'):
+    """The slug the instance's name gives, before any suffix"""
+    max_length = instance._meta.get_field('slug').max_length - SUFFIX_LENGTH
+    return slugify(getattr(instance, source))[:max_length].strip('-') or instance._meta.model_name
+
+
+def slug_fits(slug, base):
+    """True for base itself and base-<n>, so renames only re-slug when needed"""
+    return bool(slug) and re.fullmatch(rf'{re.escape(base)}(-[0-9]{{1,{MAX_SUFFIX_DIGITS}}})?', slug) is not None
+
+
+def next_free_slug(queryset, base):
+    """
+    base if nobody in queryset has it, otherwise base-<highest suffix + 1>.
+
+    Counts the exact match and takes the largest numeric suffix of
+    base-<n> in the same query; both use the slug index.
+    """
+    suffixed = Q(slug__regex=rf'^{re.escape(base)}-[0-9]{{1,{MAX_SUFFIX_DIGITS}}}$')
+    found = queryset.filter(Q(slug=base) | Q(slug__startswith=f'{base}-')).aggregate(
+        exact=Count('pk', filter=Q(slug=base)),
+        top=Max(Cast(Substr('slug', len(base) + 2), BigIntegerField()), filter=suffixed),
+    )
+    if not found['exact'] and found['top'] is None:
+        return base
+    return f'{base}-{(found["top"] or 0) + 1}'
+
+
+def allocate_slugs(instances, queryset):
+    """Free slugs for unsaved instances, one query per distinct name"""
+    by_base = {}
+    for instance in instances:
+        by_base.setdefault(slug_base(instance), []).append(instance)
+    for base, group in by_base.items():
+        slug = next_free_slug(queryset, base)
+        # Suffixes above the highest one in use are all free
+        counter = int(slug.rsplit('-', 1)[1]) if slug != base else 0
+        for instance in group:
+            instance.slug = f'{base}-{counter}' if counter else base
+            counter += 1
+
+
+def _slug_owners(instance, scope):
+    owners = type(instance)._default_manager.filter(**{field: getattr(instance, field) for field in scope})
+    return owners.exclude(pk=instance.pk) if instance.pk else owners
+
+
+def save_with_slug(instance, save, *args, scope=(), **kwargs):
+    """
+    Call save(*args, **kwargs), first giving the instance a free slug if it
+    has none. scope names the fields the slug is unique together with
+    (e.g. a subcategory's category). A conflicting concurrent insert makes
+    the save fail inside its savepoint, and the slug is allocated again.
+    """
+    update_fields = kwargs.get('update_fields')
+    if instance.slug or (update_fields is not None and 'slug' not in update_fields):
+        return save(*args, **kwargs)
+
+    base = slug_base(instance)
+    owners = _slug_owners(instance, scope)
+    for attempt in range(SLUG_RETRIES):
+        instance.slug = next_free_slug(owners, base)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            if attempt == SLUG_RETRIES - 1 or not owners.filter(slug=instance.slug).exists():
+                instance.slug = ''
+                raise
@@ -0,0 +1,176 @@
+import io
+from unittest import mock
+
+from django.core import signing
+from django.db import IntegrityError
+from django.test import RequestFactory, TestCase
+
+from accounts.models import User
+from .bulk import import_csv
+from .models import Category, Product, SubCategory
+from .pagination import CURSOR_SALT, MAX_NUMBERED_PAGES, CursorPaginator, InvalidCursor, paginate
+from .slugs import allocate_slugs, next_free_slug, slug_fits
+
+
+class CatalogTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'x', is_seller=True)
+        cls.category = Category.objects.create(name='Footwear')
+
+    @classmethod
+    def make_product(cls, name, price=100, **kwargs):
+        return Product.objects.create(
+            seller=cls.seller, category=cls.category, name=name, description=name, price=price, **kwargs
+        )
+
+
+class CursorPaginationTests(CatalogTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Few distinct prices, so most page boundaries fall inside a tie
+        cls.products = [cls.make_product(f'Product {i}', price=100 + i % 3) for i in range(23)]
+
+    def setUp(self):
+        self.queryset = Product.objects.order_by('price')
+        self.expected = list(self.queryset.order_by('price', 'id').values_list('pk', flat=True))
+
+    def walk(self, paginator, pk=lambda row: row.pk):
+        seen, pages, page = [], [], paginator.page()
+        while True:
+            pages.append(page)
+            seen += [pk(row) for row in page]
+            if not page.has_next():
+                return seen, pages
+            page = paginator.page(page.next_cursor)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen, pages = self.walk(CursorPaginator(self.queryset, 5))
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertFalse(pages[0].has_previous())
+
+    def test_previous_cursor_returns_the_previous_page(self):
+        paginator = CursorPaginator(self.queryset, 5)
+        seen, pages = self.walk(paginator)
+        for before, page in zip(pages, pages[1:]):
+            previous = paginator.page(page.previous_cursor)
+            self.assertEqual([p.pk for p in previous], [p.pk for p in before])
+
+    def test_tampered_cursor_is_rejected(self):
+        paginator = CursorPaginator(self.queryset, 5)
+        cursor = paginator.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            paginator.page(cursor[:-2] + ('A' if cursor[-2] != 'A' else 'B') + cursor[-1])
+
+    def test_cursor_for_other_keys_is_rejected(self):
+        forged = signing.dumps(['next', [1]], salt=CURSOR_SALT, compress=True)
+        with self.assertRaises(InvalidCursor):
+            CursorPaginator(self.queryset, 5).page(forged)
+        unsalted = signing.dumps(['next', ['100.00', 1]], compress=True)
+        with self.assertRaises(InvalidCursor):
+            CursorPaginator(self.queryset, 5).page(unsalted)
+
+    def test_values_rows_can_be_paged(self):
+        rows = Product.objects.values('price', 'id')
+        paginator = CursorPaginator(rows, 5, keys=[('price', False), ('id', False)])
+        seen, pages = self.walk(paginator, pk=lambda row: row['id'])
+        self.assertEqual(seen, self.expected)
+
+    def test_paginate_switches_to_cursors_after_the_numbered_pages(self):
+        request = RequestFactory().get('/products/', {'page': MAX_NUMBERED_PAGES + 5})
+        page = paginate(request, self.queryset, per_page=2)
+        self.assertFalse(page.is_cursor)
+        self.assertEqual(page.number, MAX_NUMBERED_PAGES)
+        self.assertIsNotNone(page.next_cursor)
+
+        request = RequestFactory().get('/products/', {'cursor': page.next_cursor})
+        cursor_page = paginate(request, self.queryset, per_page=2)
+        self.assertTrue(cursor_page.is_cursor)
+        self.assertEqual(
+            [p.pk for p in cursor_page],
+            self.expected[MAX_NUMBERED_PAGES * 2:MAX_NUMBERED_PAGES * 2 + 2],
+        )
+
+    def test_paginate_falls_back_to_the_first_page_on_a_bad_cursor(self):
+        request = RequestFactory().get('/products/', {'cursor': 'not-a-cursor'})
+        page = paginate(request, self.queryset, per_page=5)
+        self.assertFalse(page.is_cursor)
+        self.assertEqual([p.pk for p in page], self.expected[:5])
+
+
+class SlugTests(CatalogTestCase):
+
+    def slugs(self, name):
+        return sorted(Product.objects.filter(name=name).values_list('slug', flat=True))
+
+    def test_repeated_names_get_numbered_slugs(self):
+        for _ in range(3):
+            self.make_product('Canvas Shoes')
+        self.assertEqual(self.slugs('Canvas Shoes'), ['canvas-shoes', 'canvas-shoes-1', 'canvas-shoes-2'])
+
+    def test_next_slug_follows_the_highest_suffix(self):
+        self.make_product('Canvas Shoes')
+        self.make_product('Canvas Shoes', slug='canvas-shoes-7')
+        self.make_product('Canvas Shoes Red')
+        self.assertEqual(next_free_slug(Product.objects.all(), 'canvas-shoes'), 'canvas-shoes-8')
+        self.assertEqual(next_free_slug(Product.objects.all(), 'canvas'), 'canvas')
+
+    def test_overlong_suffixes_are_not_counters(self):
+        self.make_product('Canvas Shoes')
+        self.make_product('Canvas Shoes', slug='canvas-shoes-' + '9' * 20)
+        self.assertEqual(next_free_slug(Product.objects.all(), 'canvas-shoes'), 'canvas-shoes-1')
+        self.assertFalse(slug_fits('canvas-shoes-' + '9' * 20, 'canvas-shoes'))
+        self.assertTrue(slug_fits('canvas-shoes-12', 'canvas-shoes'))
+
+    def test_allocate_slugs_gives_a_batch_distinct_slugs(self):
+        self.make_product('Canvas Shoes')
+        batch = [
+            Product(seller=self.seller, category=self.category, name=name, description='', price=1)
+            for name in ('Canvas Shoes', 'Canvas Shoes', 'Sandals')
+        ]
+        allocate_slugs(batch, Product.objects.all())
+        self.assertEqual([p.slug for p in batch], ['canvas-shoes-1', 'canvas-shoes-2', 'sandals'])
+
+    def test_save_retries_when_a_concurrent_save_took_the_slug(self):
+        self.make_product('Canvas Shoes')
+        # The first lookup misses the row a concurrent save just inserted
+        with mock.patch('products.slugs.next_free_slug', side_effect=['canvas-shoes', 'canvas-shoes-1']) as lookup:
+            product = self.make_product('Canvas Shoes')
+        self.assertEqual(lookup.call_count, 2)
+        self.assertEqual(product.slug, 'canvas-shoes-1')
+        self.assertEqual(self.slugs('Canvas Shoes'), ['canvas-shoes', 'canvas-shoes-1'])
+
+    def test_save_gives_up_after_repeated_conflicts(self):
+        self.make_product('Canvas Shoes')
+        with mock.patch('products.slugs.next_free_slug', return_value='canvas-shoes'):
+            with self.assertRaises(IntegrityError):
+                self.make_product('Canvas Shoes')
+        self.assertEqual(self.slugs('Canvas Shoes'), ['canvas-shoes'])
+
+    def test_subcategory_slugs_are_unique_per_category(self):
+        other = Category.objects.create(name='Apparel')
+        first = SubCategory.objects.create(category=self.category, name='Men')
+        second = SubCategory.objects.create(category=other, name='Men')
+        third = SubCategory.objects.create(category=self.category, name='Men')
+        self.assertEqual((first.slug, second.slug, third.slug), ('men', 'men', 'men-1'))
+        self.assertEqual(
+            [Category.objects.create(name='Bags').slug for _ in range(2)], ['bags', 'bags-1']
+        )
+
+    def test_csv_rename_gives_a_new_slug(self):
+        product = self.make_product('Canvas Shoes')
+        kept = self.make_product('Sandals')
+        self.make_product('Leather Boots')
+        upload = io.BytesIO(
+            f'id,name\n{product.pk},Leather Boots\n{kept.pk},sandals\n'.encode()
+        )
+        result = import_csv(Product.objects.all(), upload, self.seller)
+        self.assertEqual((result.updated, result.errors), (2, []))
+        product.refresh_from_db()
+        kept.refresh_from_db()
+        self.assertEqual(product.slug, 'leather-boots-1')
+        self.assertEqual(kept.slug, 'sandals')
@@ -1,69 +1,89 @@
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
-from django.db.models import Q, Avg
-from .models import Product, Category, SubCategory
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import NullIf
+from .models import Product, Category, SubCategory, RelatedProduct
+from .search import get_search_backend
+from .pagination import paginate
+from .instrumentation import traced_listing
+from .caching import cache_anonymous_page
+from .facets import selected_facets, filter_by_facets, build_facets
 
 
+@cache_anonymous_page
+@traced_listing
 def product_list(request):
     """List all products with optional filtering"""
     products = Product.objects.filter(is_active=True).select_related('category', 'subcategory', 'seller')
     categories = Category.objects.filter(is_active=True)
-    
-    # Debug logging
-    print(f"DEBUG: Initial products count: {products.count()}")
+    trace = request.listing_trace
     
     # Search functionality
     query = request.GET.get('q')
     if query:
-        products = products.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query)
-        )
-        print(f"DEBUG: After search filter '{query}', products count: {products.count()}")
+        products = get_search_backend().search(products, query)
+        trace.filter('q', query)
     
     # Category filter
     category_slug = request.GET.get('category')
     if category_slug:
         products = products.filter(category__slug=category_slug)
-        print(f"DEBUG: After category filter '{category_slug}', products count: {products.count()}")
+        trace.filter('category', category_slug)
     
     # SubCategory filter
     subcategory_slug = request.GET.get('subcategory')
     if subcategory_slug:
         products = products.filter(subcategory__slug=subcategory_slug)
-        print(f"DEBUG: After subcategory filter '{subcategory_slug}', products count: {products.count()}")
+        trace.filter('subcategory', subcategory_slug)
     
     # Price range filter
     min_price = request.GET.get('min_price')
     max_price = request.GET.get('max_price')
     if min_price:
-        products = products.filter(price__gte=min_price)
+        products = products.filter(effective_price__gte=min_price)
     if max_price:
-        products = products.filter(price__lte=max_price)
+        products = products.filter(effective_price__lte=max_price)
+    trace.filter('min_price', min_price)
+    trace.filter('max_price', max_price)
+    
+    # Attribute facets (Color, Size, Brand, ...)
+    selected = selected_facets(request)
+    trace.filter('facets', selected)
+    # Counted before the selections apply, so other values stay selectable
+    facets = build_facets(
+        request, products, selected,
+        category_slug=category_slug,
+        subcategory_slug=subcategory_slug,
+        cacheable=not (query or min_price or max_price)
+    )
+    products = filter_by_facets(products, selected)
     
     # Sorting
     sort_by = request.GET.get('sort', '-created_at')
+    trace.filter('sort', sort_by)
     if sort_by == 'price_low':
-        products = products.order_by('price')
+        products = products.order_by('effective_price')
     elif sort_by == 'price_high':
-        products = products.order_by('-price')
+        products = products.order_by('-effective_price')
     elif sort_by == 'name':
         products = products.order_by('name')
     elif sort_by == 'newest':
         products = products.order_by('-created_at')
+    elif sort_by == 'rating':
+        products = products.annotate(
+            rating_avg=ExpressionWrapper(
+                F('rating_sum') * 1.0 / NullIf(F('rating_count'), 0),
+                output_field=FloatField()
+            )
+        ).order_by(F('rating_avg').desc(nulls_last=True), '-rating_count')
     
     # Pagination
-    paginator = Paginator(products, 12)
-    page = request.GET.get('page')
-    products = paginator.get_page(page)
-    
-    print(f"DEBUG: Final products in page: {len(products)}")
-    print(f"DEBUG: Products object list: {products.object_list}")
+    products = paginate(request, products)
+    trace.result(products)
     
     context = {
         'products': products,
         'categories': categories,
+        'facets': facets,
         'query': query,
         'current_category': category_slug,
         'current_sort': sort_by,
@@ -71,6 +91,7 @@ def product_list(request):
     return render(request, 'products/product_list.html', context)
 
 
+@cache_anonymous_page
 def product_detail(request, slug):
     """Display product details"""
     product = get_object_or_404(
@@ -79,11 +100,16 @@ def product_detail(request, slug):
         is_active=True
     )
     
-    # Get related products
-    related_products = Product.objects.filter(
-        category=product.category,
-        is_active=True
-    ).exclude(id=product.id)[:4]
+    # Get related products (precomputed, falling back to the same category)
+    related_products = [
+        entry.related for entry in
+        RelatedProduct.objects.filter(product=product, related__is_active=True).select_related('related')[:4]
+    ]
+    if not related_products:
+        related_products = Product.objects.filter(
+            category=product.category,
+            is_active=True
+        ).exclude(id=product.id)[:4]
     
     # Get product reviews
     reviews = product.reviews.select_related('user').order_by('-created_at')
@@ -100,6 +126,8 @@ def product_detail(request, slug):
     return render(request, 'products/product_detail.html', context)
 
 
+@cache_anonymous_page
+@traced_listing
 def category_products(request, category_slug):
     """List products by category"""
     category = get_object_or_404(Category, slug=category_slug, is_active=True)
@@ -107,9 +135,8 @@ def category_products(request, category_slug):
     subcategories = category.subcategories.filter(is_active=True)
     
     # Pagination
-    paginator = Paginator(products, 12)
-    page = request.GET.get('page')
-    products = paginator.get_page(page)
+    products = paginate(request, products)
+    request.listing_trace.result(products)
     
     context = {
         'category': category,
@@ -119,6 +146,8 @@ def category_products(request, category_slug):
     return render(request, 'products/category_products.html', context)
 
 
+@cache_anonymous_page
+@traced_listing
 def subcategory_products(request, category_slug, subcategory_slug):
     """List products by subcategory"""
     category = get_object_or_404(Category, slug=category_slug, is_active=True)
@@ -126,9 +155,8 @@ def subcategory_products(request, category_slug, subcategory_slug):
     products = Product.objects.filter(subcategory=subcategory, is_active=True)
     
     # Pagination
-    paginator = Paginator(products, 12)
-    page = request.GET.get('page')
-    products = paginator.get_page(page)
+    products = paginate(request, products)
+    request.listing_trace.result(products)
     
     context = {
         'category': category,
@@ -138,23 +166,19 @@ def subcategory_products(request, category_slug, subcategory_slug):
     return render(request, 'products/subcategory_products.html', context)
 
 
+@traced_listing
 def search_products(request):
     """Search products"""
     query = request.GET.get('q', '')
     products = Product.objects.filter(is_active=True)
     
     if query:
-        products = products.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query) |
-            Q(subcategory__name__icontains=query)
-        )
+        products = get_search_backend().search(products, query)
+        request.listing_trace.filter('q', query)
     
     # Pagination
-    paginator = Paginator(products, 12)
-    page = request.GET.get('page')
-    products = paginator.get_page(page)
+    products = paginate(request, products)
+    request.listing_trace.result(products)
     
     context = {
         'products': products,
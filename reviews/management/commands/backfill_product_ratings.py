@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from products.models import Product
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Recompute Product.rating_count / rating_sum from the reviews table'
+
+    def handle(self, *args, **kwargs):
+        per_product = Review.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        updated = Product.objects.update(
+            rating_count=Coalesce(
+                Subquery(per_product.annotate(c=Count('id')).values('c'), output_field=IntegerField()), 0
+            ),
+            rating_sum=Coalesce(
+                Subquery(per_product.annotate(s=Sum('rating')).values('s'), output_field=IntegerField()), 0
+            ),
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Backfilled ratings for {updated} products'))
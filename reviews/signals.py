@@ -0,0 +1,44 @@
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from .models import Review
+
+
+@receiver(post_init, sender=Review)
+def remember_rating(sender, instance, **kwargs):
+    """Keep the loaded rating/product so saves can apply a delta"""
+    instance._loaded_rating = instance.rating if instance.pk else None
+    instance._loaded_product_id = instance.product_id if instance.pk else None
+
+
+def _apply(product_id, count_delta, sum_delta):
+    if product_id is None or (not count_delta and not sum_delta):
+        return
+    Product.objects.filter(pk=product_id).update(
+        rating_count=F('rating_count') + count_delta,
+        rating_sum=F('rating_sum') + sum_delta,
+    )
+
+
+@receiver(post_save, sender=Review)
+def add_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance._loaded_rating is None:
+        _apply(instance.product_id, 1, instance.rating)
+    elif instance._loaded_product_id != instance.product_id:
+        _apply(instance._loaded_product_id, -1, -instance._loaded_rating)
+        _apply(instance.product_id, 1, instance.rating)
+    else:
+        _apply(instance.product_id, 0, instance.rating - instance._loaded_rating)
+    instance._loaded_rating = instance.rating
+    instance._loaded_product_id = instance.product_id
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating(sender, instance, **kwargs):
+    rating = instance._loaded_rating if instance._loaded_rating is not None else instance.rating
+    product_id = instance._loaded_product_id or instance.product_id
+    _apply(product_id, -1, -rating)